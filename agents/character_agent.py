@@ -1,20 +1,11 @@
 from utils.db import get_connection
-import openai
-import os
+from utils.llm_gateway import get_llm_gateway
 import random
-from dotenv import load_dotenv
 import json
 
-load_dotenv()
-
 class CharacterAgent():
     def __init__(self):
-        self.client = openai.AzureOpenAI(
-            api_key=os.getenv("AZURE_OPENAI_LLM_KEY"),
-            api_version=os.getenv("AZURE_OPENAI_LLM_API_VERSION"),
-            azure_endpoint=os.getenv("AZURE_OPENAI_LLM_ENDPOINT"),
-        )
-        self.deployment = os.getenv("AZURE_OPENAI_LLM_DEPLOYMENT_NAME")
+        self.llm = get_llm_gateway()
         
         # Avatar configuration
         self.avatar_count = 3  # 3 avatars per gender
@@ -45,10 +36,7 @@ class CharacterAgent():
             {"role": "user", "content": f"Create an educational character named {name}. Make them interesting and engaging for learners."}
         ]
 
-        response = self.client.chat.completions.create(
-            model=self.deployment,
-            messages=messages,
-        )
+        response = self.llm.chat("character", messages)
 
         raw = response.choices[0].message.content.strip()
         try:
@@ -1,19 +1,10 @@
-import openai
-import os
 import json
 import re
-from dotenv import load_dotenv
-
-load_dotenv()
+from utils.llm_gateway import get_llm_gateway
 
 class CurriculumAgent():
     def __init__(self):
-        self.client = openai.AzureOpenAI(
-            api_key=os.getenv("AZURE_OPENAI_LLM_KEY"),
-            api_version=os.getenv("AZURE_OPENAI_LLM_API_VERSION"),
-            azure_endpoint=os.getenv("AZURE_OPENAI_LLM_ENDPOINT"),
-        )
-        self.deployment = os.getenv("AZURE_OPENAI_LLM_DEPLOYMENT_NAME")
+        self.llm = get_llm_gateway()
 
     
     def run(self, topic):
@@ -29,11 +20,10 @@ class CurriculumAgent():
         ]
 
         try:
-            response = self.client.chat.completions.create(
-                model=self.deployment,
-                messages=messages,
+            response = self.llm.chat(
+                "curriculum",
+                messages,
                 max_completion_tokens=3000,
-            
             )
 
             raw = response.choices[0].message.content.strip()
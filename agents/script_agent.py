@@ -1,40 +1,66 @@
 import difflib
 import json
-import openai
-import os
-from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor
+from utils.llm_gateway import get_llm_gateway
 
-load_dotenv()
+SCRIPT_MAX_CONCURRENCY = 3  # Lessons written at once; the LLM gateway still caps requests in flight
 
 class ScriptAgent():
-    def __init__(self):
-        self.client = openai.AzureOpenAI(
-            api_key=os.getenv("AZURE_OPENAI_LLM_KEY"),
-            api_version=os.getenv("AZURE_OPENAI_LLM_API_VERSION"),
-            azure_endpoint=os.getenv("AZURE_OPENAI_LLM_ENDPOINT"),
-        )
-        self.deployment = os.getenv("AZURE_OPENAI_LLM_DEPLOYMENT_NAME")
+    def __init__(self, max_concurrency: int = SCRIPT_MAX_CONCURRENCY):
+        self.llm = get_llm_gateway()
+        self.max_concurrency = max(1, max_concurrency)
 
     def run(self, input_data):
+        """Scripts for every lesson that succeeded, in curriculum order"""
+        scripts, _ = self.generate_scripts(input_data)
+        return scripts
+
+    def generate_scripts(self, input_data):
+        """
+        Write every lesson concurrently; each lesson's overlay extraction follows as soon as its
+        own script is done. Returns the scripts in curriculum order and the lessons that failed
+        as {"lesson", "error"}; a failed lesson is left out rather than failing the others.
+        """
         character = input_data["character"]
         lessons = input_data["lessons"]
+        if not lessons:
+            return [], []
+
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(lessons))) as executor:
+            futures = [
+                executor.submit(self.generate_lesson, character, lesson, i)
+                for i, lesson in enumerate(lessons, 1)
+            ]
 
         all_scripts = []
-        for i, lesson in enumerate(lessons, 1):
-            print(f"📘 Generating expressive script for Lesson {i}: {lesson['title']}...")
+        failed = []
+        errors = []
+        for i, (lesson, future) in enumerate(zip(lessons, futures), 1):
+            try:
+                all_scripts.append(future.result())
+            except Exception as e:
+                print(f"❌ Script for Lesson {i}: {lesson['title']} failed: {e}")
+                failed.append({"lesson": lesson["title"], "error": str(e)})
+                errors.append(e)
+
+        if errors and not all_scripts:
+            raise errors[0]
+        return all_scripts, failed
 
-            script = self.generate_script(character, lesson, i)
+    def generate_lesson(self, character, lesson, lesson_number):
+        """Script and overlay data for one lesson"""
+        print(f"📘 Generating expressive script for Lesson {lesson_number}: {lesson['title']}...")
+        script = self.generate_script(character, lesson, lesson_number)
 
-            # Extract key concepts and overlay points
-            print(f"🔍 Extracting key concepts for dynamic overlays...")
-            overlay_data = self.extract_overlay_data(lesson, script)
+        # Extract key concepts and overlay points
+        print(f"🔍 Extracting key concepts for dynamic overlays (Lesson {lesson_number})...")
+        overlay_data = self.extract_overlay_data(lesson, script)
 
-            all_scripts.append({
-                "lesson": lesson["title"],
-                "script": script,
-                "overlay_data": overlay_data
-            })
-        return all_scripts
+        return {
+            "lesson": lesson["title"],
+            "script": script,
+            "overlay_data": overlay_data
+        }
 
     def generate_script(self, character, lesson, lesson_number):
         # Extract character personality for better emotion matching
@@ -90,9 +116,9 @@ class ScriptAgent():
             {"role": "user", "content": user_prompt}
         ]
 
-        response = self.client.chat.completions.create(
-            model=self.deployment,
-            messages=messages,
+        response = self.llm.chat(
+            "script",
+            messages,
             max_completion_tokens=5000  # (5000 gave good results) Increased for more expressive content
         )
 
@@ -164,9 +190,9 @@ class ScriptAgent():
                 {"role": "user", "content": user_prompt}
             ]
             
-            response = self.client.chat.completions.create(
-                model=self.deployment,
-                messages=messages,
+            response = self.llm.chat(
+                "script",
+                messages,
                 max_completion_tokens=3000,
             )
             
@@ -1,7 +1,8 @@
 import os
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 from typing import Optional, Dict
 from .constants import AVATAR_SIZE, COLORS
+from .font_registry import get_font_registry
 
 class AvatarManager:
     
@@ -17,7 +18,7 @@ class AvatarManager:
         if cache_key in self.avatar_cache:
             return self.avatar_cache[cache_key]
         
-        avatar_path = os.path.join(self.avatar_dir, gender, f"avatar_{avatar_id}.png")
+        avatar_path = self.avatar_path(gender, avatar_id)
         
         try:
             avatar = Image.open(avatar_path).convert("RGBA")
@@ -29,6 +30,10 @@ class AvatarManager:
             print(f"⚠️ Could not load avatar {avatar_path}: {e}")
             return None
     
+    def avatar_path(self, gender: str, avatar_id: int) -> str:
+        """Path of the avatar image for gender and avatar_id"""
+        return os.path.join(self.avatar_dir, gender, f"avatar_{avatar_id}.png")
+    
     # Fallback - Create a default avatar if image not found
     def create_default_avatar(self, initial: str, is_character: bool, size: int = AVATAR_SIZE) -> Image.Image:
         avatar = Image.new('RGBA', (size, size), (0, 0, 0, 0))
@@ -41,10 +46,9 @@ class AvatarManager:
         draw.ellipse([0, 0, size-1, size-1], fill=bg_color)
         
         # Draw initial
-        try:
-            font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", int(size * 0.4))
-        except:
-            font = ImageFont.load_default()
+        registry = get_font_registry()
+        found = registry.first_available(["/System/Library/Fonts/Helvetica.ttc"], int(size * 0.4))
+        font = found[1] if found else registry.default()
         
         bbox = draw.textbbox((0, 0), initial, font=font)
         text_width = bbox[2] - bbox[0]
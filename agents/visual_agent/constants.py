@@ -6,6 +6,29 @@ AUDIO_CODEC = 'aac'
 VIDEO_PRESET = 'faster'
 VIDEO_THREADS = 8
 VIDEO_BITRATE = "2000k"
+AUDIO_FPS = 44100
+
+# Encoding tuning: 'slides' uses CRF with the stillimage tune, long GOPs and keyframes at slide starts;
+# 'bitrate' is the plain fixed-bitrate encode at VIDEO_BITRATE
+ENCODE_TUNING = 'slides'
+VIDEO_CRF = 23
+VIDEO_TUNE = 'stillimage'
+VIDEO_GOP_SECONDS = 10  # Longest keyframe interval inside a slide
+
+# Render profiles: output size, frame rate and encoder speed; the layout scales with the height
+RENDER_PROFILES = {
+    'production': {'video_size': VIDEO_SIZE, 'fps': FPS, 'preset': VIDEO_PRESET, 'bitrate': VIDEO_BITRATE,
+                   'crf': VIDEO_CRF},
+    'draft': {'video_size': (640, 360), 'fps': 8, 'preset': 'ultrafast', 'bitrate': "600k", 'crf': 28},
+}
+RENDER_PROFILE = 'production'
+
+# Encoder mode: 'still' holds each distinct frame with ffmpeg, 'moviepy' composites every frame
+ENCODER_MODE = 'still'
+# Parallel chunks for the 'still' encoder: 1 encodes in a single pass, 0 uses every core
+ENCODE_WORKERS = 1
+# Slide rendering processes: 1 renders in the calling process, 0 uses every core
+RENDER_WORKERS = 1
 
 # Avatar settings
 AVATAR_SIZE = 300  # Large avatar size
@@ -45,6 +68,7 @@ FONT_SIZES = {
     'speaker': 24,
     'progress': 18
 }
+BODY_FONT_MIN_SIZE = 18  # Long bubble text shrinks from FONT_SIZES['body'] down to this size to fit
 
 FONT_PATHS = {
     'title': [
@@ -68,6 +92,7 @@ MIN_DURATIONS = {
 }
 
 # Transition settings
+TRANSITION_MODE = 'fade'  # 'fade' from black or 'crossfade' from the previous slide
 FADE_DURATION = 0.2
 CROSSFADE_DURATION = 0.5
 PADDING_DURATION = 0.7  # Audio padding to prevent early transitions
@@ -88,6 +113,23 @@ TAIL_OFFSET = 40
 BADGE_PADDING = 25
 NAME_BG_PADDING = 15
 
+# Text layout settings
+TEXT_LAYOUT_CACHE_SIZE = 4096  # Memoized wraps and line measurements per TextManager
+WRAP_CHECK_MARGIN = 2  # Estimated line widths this close to the limit are re-measured exactly
+TEXT_RASTERIZER = 'atlas'  # 'atlas' (cached glyph masks, numpy blending) or 'pillow' (ImageDraw.text)
+
+# Overlay sprite settings
+OVERLAY_PADDING = 10
+OVERLAY_LINE_SPACING = 1.25
+SPRITE_CACHE_DIR = "cache/sprites"
+SPRITE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+SPRITE_CACHE_MEMORY_BYTES = 16 * 1024 * 1024
+
+# Slide render cache settings
+SLIDE_CACHE_DIR = "cache/slides"
+SLIDE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+SLIDE_CACHE_MEMORY_BYTES = 64 * 1024 * 1024
+
 # Default durations
 DEFAULT_SLIDE_DURATION = 3.5
 END_SLIDE_DURATION = 3.0
\ No newline at end of file
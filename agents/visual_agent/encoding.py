@@ -0,0 +1,42 @@
+from typing import List, Optional, Sequence
+from .constants import *
+
+class EncodingSettings:
+    """x264 rate control and keyframe placement shared by the still-frame and MoviePy encoders"""
+
+    def __init__(self, fps: int = FPS, preset: str = VIDEO_PRESET, bitrate: str = VIDEO_BITRATE,
+                 crf: int = VIDEO_CRF, tuning: str = ENCODE_TUNING):
+        if tuning not in ('slides', 'bitrate'):
+            raise ValueError(f"Unknown encode tuning: {tuning}")
+        self.fps = fps
+        self.preset = preset
+        self.bitrate = bitrate
+        self.crf = crf
+        self.tuning = tuning
+
+    @property
+    def video_bitrate(self) -> Optional[str]:
+        """Target bitrate, or None when quality is controlled by CRF"""
+        return self.bitrate if self.tuning == 'bitrate' else None
+
+    def rate_args(self) -> List[str]:
+        if self.tuning == 'bitrate':
+            return ['-b:v', self.bitrate]
+        return ['-crf', str(self.crf)]
+
+    def tuning_args(self, keyframes: Sequence[int] = ()) -> List[str]:
+        """
+        Tune, GOP and keyframe options for mostly static slides. Scene-cut detection is off so
+        I-frames land only on slide starts (given as output frame numbers) and at most every
+        VIDEO_GOP_SECONDS inside a long slide.
+        """
+        if self.tuning == 'bitrate':
+            return []
+
+        args = ['-tune', VIDEO_TUNE, '-g', str(int(VIDEO_GOP_SECONDS * self.fps)), '-sc_threshold', '0']
+        keyframes = sorted(set(int(frame) for frame in keyframes if frame > 0))
+        if keyframes:
+            # Frame-number expression, so keyframes never drift onto a neighbouring frame
+            expression = '+'.join(f'eq(n,{frame})' for frame in keyframes)
+            args += ['-force_key_frames', f'expr:{expression}']
+        return args
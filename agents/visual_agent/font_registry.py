@@ -0,0 +1,79 @@
+import threading
+from PIL import ImageFont
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+_font_registry: Optional["FontRegistry"] = None
+_registry_lock = threading.Lock()
+
+def get_font_registry() -> "FontRegistry":
+    """Process-wide font registry shared by every agent, renderer and thread"""
+    global _font_registry
+    with _registry_lock:
+        if _font_registry is None:
+            _font_registry = FontRegistry()
+        return _font_registry
+
+class FontRegistry:
+    """Loads each (path, size, index) font once per process and remembers paths that failed"""
+
+    def __init__(self):
+        self._fonts: Dict[Tuple[str, int, int], ImageFont.FreeTypeFont] = {}
+        self._variants: Dict[Tuple[int, int], tuple] = {}
+        self._missing: Set[Tuple[str, int]] = set()
+        self._default: Optional[ImageFont.FreeTypeFont] = None
+        self._lock = threading.RLock()
+
+    def get(self, path: str, size: int, index: int = 0) -> ImageFont.FreeTypeFont:
+        """Return the font, loading it on first use; raises OSError if it cannot be opened"""
+        key = (path, size, index)
+        font = self._fonts.get(key)
+        if font is not None:
+            return font
+
+        with self._lock:
+            if key in self._fonts:
+                return self._fonts[key]
+            if (path, index) in self._missing:
+                raise OSError(f"cannot open font {path}")
+            try:
+                font = ImageFont.truetype(path, size, index=index)
+            except OSError:
+                # Missing files fail the same way at every size, so they are probed only once
+                self._missing.add((path, index))
+                raise
+            self._fonts[key] = font
+            return font
+
+    def first_available(self, paths: Iterable[str], size: int, index: int = 0) -> Optional[Tuple[str, ImageFont.FreeTypeFont]]:
+        """(path, font) for the first path that loads, or None if none does"""
+        for path in paths:
+            try:
+                return path, self.get(path, size, index)
+            except OSError:
+                continue
+        return None
+
+    def default(self) -> ImageFont.FreeTypeFont:
+        """Pillow's built-in default font, loaded once"""
+        with self._lock:
+            if self._default is None:
+                self._default = ImageFont.load_default()
+            return self._default
+
+    def variant(self, font, size: int):
+        """The same face at another size; bitmap fonts cannot be resized and come back unchanged"""
+        if not hasattr(font, 'font_variant'):
+            return font
+        if isinstance(font.path, str):
+            return self.get(font.path, size, font.index)
+
+        # Fonts loaded from memory, like the default font, are keyed by the face object,
+        # which is kept alongside its variant so the id cannot be reused
+        key = (id(font), size)
+        with self._lock:
+            if key not in self._variants:
+                self._variants[key] = (font, font.font_variant(size=size))
+            return self._variants[key][1]
+
+    def stats(self) -> Dict:
+        return {'fonts': len(self._fonts) + len(self._variants), 'missing_paths': len(self._missing)}
@@ -0,0 +1,95 @@
+import re
+from collections import deque
+from typing import Dict, List, Sequence, Tuple
+
+# Same tokenization as the slide text: words, or single non-word characters
+TOKEN_PATTERN = re.compile(r'\w+|[^\w]')
+WORD_PATTERN = re.compile(r'\w+')
+
+class KeywordHighlighter:
+    """
+    Aho-Corasick automaton over the word tokens of the highlight phrases, compiled once per lesson.
+    Phrases match case-insensitively on consecutive words, skipping spaces and punctuation between
+    them; the longest phrase starting at the leftmost word wins and matches never overlap.
+    """
+
+    def __init__(self, phrases: Sequence[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._lengths: List[List[int]] = [[]]  # Word counts of the phrases ending at each node
+
+        for phrase in phrases:
+            words = WORD_PATTERN.findall(phrase.lower()) if phrase else []
+            if words:
+                self._add(words)
+        self._link()
+
+    def _add(self, words: List[str]):
+        node = 0
+        for word in words:
+            child = self._goto[node].get(word)
+            if child is None:
+                child = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._lengths.append([])
+                self._goto[node][word] = child
+            node = child
+        if len(words) not in self._lengths[node]:
+            self._lengths[node].append(len(words))
+
+    def _link(self):
+        """Breadth-first failure links; each node also reports the phrases ending at its suffixes"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for word, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and word not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(word, 0)
+                self._lengths[child] = self._lengths[child] + [
+                    length for length in self._lengths[self._fail[child]]
+                    if length not in self._lengths[child]
+                ]
+                queue.append(child)
+
+    def find(self, words: List[str]) -> List[Tuple[int, int]]:
+        """Leftmost-longest, non-overlapping matches in lowercase words as (first word, word count)"""
+        longest = [0] * len(words)
+        node = 0
+        for end, word in enumerate(words):
+            while node and word not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(word, 0)
+            for length in self._lengths[node]:
+                start = end - length + 1
+                longest[start] = max(longest[start], length)
+
+        matches = []
+        i = 0
+        while i < len(words):
+            if longest[i]:
+                matches.append((i, longest[i]))
+                i += longest[i]
+            else:
+                i += 1
+        return matches
+
+    def segment_line(self, line: str) -> List[Tuple[bool, List[str]]]:
+        """Split a line into alternating (highlighted, tokens) runs in drawing order"""
+        tokens = TOKEN_PATTERN.findall(line)
+        word_indices = [i for i, token in enumerate(tokens) if WORD_PATTERN.match(token)]
+        matches = self.find([tokens[i].lower() for i in word_indices])
+
+        segments = []
+        position = 0
+        for first, count in matches:
+            start, end = word_indices[first], word_indices[first + count - 1] + 1
+            if position < start:
+                segments.append((False, tokens[position:start]))
+            segments.append((True, tokens[start:end]))
+            position = end
+        if position < len(tokens):
+            segments.append((False, tokens[position:]))
+        return segments
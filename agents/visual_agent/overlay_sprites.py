@@ -0,0 +1,81 @@
+import io
+import numpy as np
+from PIL import Image, ImageColor, ImageDraw
+from typing import Optional
+from utils.disk_cache import DiskCache
+from .constants import *
+from .text_utils import TextManager
+
+_sprite_cache: Optional[DiskCache] = None
+
+def get_sprite_cache() -> DiskCache:
+    """Process-wide sprite cache shared by every job; its disk tier persists across runs"""
+    global _sprite_cache
+    if _sprite_cache is None:
+        _sprite_cache = DiskCache(SPRITE_CACHE_DIR, SPRITE_CACHE_MAX_BYTES,
+                                  memory_max_bytes=SPRITE_CACHE_MEMORY_BYTES, suffix=".npy")
+    return _sprite_cache
+
+class OverlaySpriteRenderer:
+    """Rasterizes caption and emphasis boxes in-process as RGBA numpy sprites"""
+
+    def __init__(self, video_size: tuple, text_manager: TextManager, cache: Optional[DiskCache] = None,
+                 padding: int = OVERLAY_PADDING):
+        self.width, self.height = video_size
+        self.text_manager = text_manager
+        self.padding = padding
+        self.cache = cache if cache is not None else get_sprite_cache()
+
+    def render(self, text: str, fontsize: int, bg_color: str = 'black',
+               size_ratio: float = 0.8, color: str = 'white') -> np.ndarray:
+        """Return an RGBA sprite for a caption box, rendering it only on a cache miss"""
+        font = self.text_manager.get_sized_font('title', fontsize)
+        box_width = int(self.width * size_ratio)
+        key = DiskCache.make_key('overlay_sprite', text, fontsize, bg_color, size_ratio, color,
+                                 box_width, self.padding, self._font_identity(font))
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            return np.load(io.BytesIO(cached), allow_pickle=False)
+
+        sprite = self._rasterize(text, font, fontsize, box_width, bg_color, color)
+        buffer = io.BytesIO()
+        np.save(buffer, sprite, allow_pickle=False)
+        self.cache.put(key, buffer.getvalue())
+        return sprite
+
+    def _rasterize(self, text: str, font, fontsize: int, box_width: int,
+                   bg_color: Optional[str], color: str) -> np.ndarray:
+        """Centered, word-wrapped text on a solid (or transparent) box of fixed width"""
+        padding = max(fontsize // 3, self.padding)
+        lines = self.text_manager.wrap_text_with_font(text, font, box_width - padding * 2) or ['']
+        line_height = int(fontsize * OVERLAY_LINE_SPACING)
+        box_height = len(lines) * line_height + padding * 2
+
+        background = ImageColor.getrgb(bg_color) + (255,) if bg_color else (0, 0, 0, 0)
+        fill = ImageColor.getrgb(color) + (255,)
+
+        if self.text_manager.rasterizer is not None:
+            # Blend glyphs from the shared atlas straight into the sprite array
+            sprite = np.empty((box_height, box_width, 4), dtype=np.uint8)
+            sprite[...] = background
+            for i, line in enumerate(lines):
+                x = (box_width - font.getlength(line)) // 2
+                self.text_manager.rasterizer.draw_array(sprite, (x, padding + i * line_height), line, font, fill)
+            return sprite
+
+        img = Image.new('RGBA', (box_width, box_height), background)
+        draw = ImageDraw.Draw(img)
+        for i, line in enumerate(lines):
+            line_width = draw.textlength(line, font=font)
+            x = (box_width - line_width) // 2
+            y = padding + i * line_height
+            draw.text((x, y), line, font=font, fill=fill)
+
+        return np.array(img)
+
+    @staticmethod
+    def _font_identity(font) -> tuple:
+        path = getattr(font, 'path', None)
+        name = font.getname() if hasattr(font, 'getname') else type(font).__name__
+        return (path if isinstance(path, str) else None, name, getattr(font, 'size', None))
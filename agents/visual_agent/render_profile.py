@@ -0,0 +1,42 @@
+from typing import Dict
+from .constants import *
+
+class RenderProfile:
+    """Output size, frame rate and encoder settings, with the slide layout scaled to match"""
+
+    def __init__(self, name: str = RENDER_PROFILE):
+        if name not in RENDER_PROFILES:
+            raise ValueError(f"Unknown render profile: {name} (expected one of {', '.join(RENDER_PROFILES)})")
+        settings = RENDER_PROFILES[name]
+        self.name = name
+        self.video_size = settings['video_size']
+        self.fps = settings['fps']
+        self.preset = settings['preset']
+        self.bitrate = settings['bitrate']
+        self.crf = settings['crf']
+
+        # Layout constants are designed for VIDEO_SIZE; production keeps them unchanged
+        self.scale = self.video_size[1] / VIDEO_SIZE[1]
+        self.layout: Dict = {
+            key: value if key == 'line_spacing' else self.px(value)
+            for key, value in LAYOUT.items()
+        }
+        self.font_sizes: Dict[str, int] = {key: self.px(size) for key, size in FONT_SIZES.items()}
+        self.body_font_min_size = self.px(BODY_FONT_MIN_SIZE)
+        self.avatar_size = self.layout['avatar_size']
+        self.avatar_size_title = self.px(AVATAR_SIZE_TITLE)
+        self.header_height_title = self.px(HEADER_HEIGHT_TITLE)
+        self.progress_width = self.px(PROGRESS_WIDTH)
+        self.progress_height = self.px(PROGRESS_HEIGHT)
+        self.tail_width = self.px(TAIL_WIDTH)
+        self.tail_offset = self.px(TAIL_OFFSET)
+        self.badge_padding = self.px(BADGE_PADDING)
+        self.overlay_padding = self.px(OVERLAY_PADDING)
+
+    def px(self, value: float) -> int:
+        """Scale a length given in production pixels, keeping hairlines at least one pixel wide"""
+        return max(1, int(round(value * self.scale))) if value else 0
+
+    @property
+    def is_production(self) -> bool:
+        return self.name == 'production'
@@ -0,0 +1,125 @@
+import hashlib
+import io
+import os
+import numpy as np
+from PIL import Image
+from typing import Dict, List, Optional
+from utils.disk_cache import DiskCache
+from . import constants
+from .constants import *
+from .avatar_manager import AvatarManager
+from .text_utils import TextManager
+from .render_profile import RenderProfile
+
+# Modules whose drawing code determines what a slide looks like
+_RENDER_MODULES = ('slide_renderer.py', 'ui_components.py', 'text_utils.py', 'avatar_manager.py',
+                   'render_profile.py', 'highlighter.py', 'text_rasterizer.py',
+                   'font_registry.py')
+
+# Constants that affect slide pixels; encoder and timing settings are deliberately left out
+_LAYOUT_CONSTANTS = (
+    'VIDEO_SIZE', 'AVATAR_SIZE', 'AVATAR_SIZE_TITLE', 'NARRATOR_AVATAR_ID', 'COLORS', 'LAYOUT',
+    'FONT_SIZES', 'BODY_FONT_MIN_SIZE', 'FONT_PATHS', 'HEADER_HEIGHT_TITLE', 'TITLE_MAX_LENGTH',
+    'PROGRESS_WIDTH', 'PROGRESS_HEIGHT', 'TAIL_WIDTH', 'TAIL_OFFSET', 'BADGE_PADDING', 'NAME_BG_PADDING',
+    'TEXT_RASTERIZER',
+)
+
+_slide_cache: Optional[DiskCache] = None
+
+def get_slide_cache() -> DiskCache:
+    """Process-wide slide cache shared by every job; its disk tier persists across runs"""
+    global _slide_cache
+    if _slide_cache is None:
+        _slide_cache = DiskCache(SLIDE_CACHE_DIR, SLIDE_CACHE_MAX_BYTES,
+                                 memory_max_bytes=SLIDE_CACHE_MEMORY_BYTES, suffix=".png")
+    return _slide_cache
+
+class SlideCache:
+    """Caches rendered slide frames under a hash of everything that affects their pixels"""
+
+    def __init__(self, avatar_manager: AvatarManager, text_manager: TextManager,
+                 profile: RenderProfile = None, cache: Optional[DiskCache] = None):
+        self.avatar_manager = avatar_manager
+        self.text_manager = text_manager
+        self.profile = profile or RenderProfile()
+        self.cache = cache if cache is not None else get_slide_cache()
+        self._renderer_digest = self._source_digest()
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, slide: Dict, slide_number: int, total_slides: int, character: Dict,
+                 lesson_title: str, highlight_words: List[str]) -> str:
+        """Hash the slide's own inputs together with fonts, avatars, layout and renderer code"""
+        if slide['type'] in ('title', 'end'):
+            # Title and end slides do not depend on their position or on highlights
+            content = (slide['type'],)
+        else:
+            content = (slide['type'], slide['text'], slide.get('speaker_name', ''),
+                       slide_number, total_slides, tuple(highlight_words))
+
+        return DiskCache.make_key(
+            'slide', content, lesson_title, self._avatar_identity(slide, character),
+            self._font_identity(), self._layout_identity(), self._renderer_digest,
+        )
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Return the cached RGB frame, or None on a miss"""
+        data = self.cache.get(key)
+        if data is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        with Image.open(io.BytesIO(data)) as img:
+            return np.array(img.convert('RGB'))
+
+    def put(self, key: str, frame: np.ndarray):
+        buffer = io.BytesIO()
+        Image.fromarray(frame).save(buffer, format='PNG', compress_level=1)
+        self.cache.put(key, buffer.getvalue())
+
+    def stats(self) -> Dict:
+        """Hits and misses of this job, plus the shared cache's totals"""
+        return {'hits': self.hits, 'misses': self.misses, 'cache': self.cache.stats()}
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+    def _avatar_identity(self, slide: Dict, character: Dict) -> tuple:
+        """Which avatar images the slide shows, and the on-disk version of each"""
+        if slide['type'] == 'end':
+            return ()
+        if slide['type'] == 'narrator':
+            gender, avatar_id, initial = 'female', NARRATOR_AVATAR_ID, 'N'
+        else:
+            gender, avatar_id, initial = character['gender'], character.get('avatar_id', 1), character['name'][0].upper()
+
+        path = self.avatar_manager.avatar_path(gender, avatar_id)
+        try:
+            stat = os.stat(path)
+            version = (stat.st_size, stat.st_mtime_ns)
+        except OSError:
+            version = None  # Falls back to the drawn default avatar
+        return (path, version, initial, character['name'] if slide['type'] == 'title' else None)
+
+    def _font_identity(self) -> tuple:
+        identity = []
+        for font_type, font in sorted(self.text_manager.fonts.items()):
+            path = getattr(font, 'path', None)
+            name = font.getname() if hasattr(font, 'getname') else type(font).__name__
+            identity.append((font_type, path if isinstance(path, str) else None, name, getattr(font, 'size', None)))
+        return tuple(identity)
+
+    def _layout_identity(self) -> tuple:
+        constants_identity = tuple((name, getattr(constants, name)) for name in _LAYOUT_CONSTANTS)
+        return (self.profile.name, self.profile.video_size, self.profile.scale, constants_identity)
+
+    @staticmethod
+    def _source_digest() -> str:
+        """Digest of the drawing code, so renderer changes never reuse stale slides"""
+        digest = hashlib.sha256()
+        module_dir = os.path.dirname(os.path.abspath(__file__))
+        for name in _RENDER_MODULES:
+            with open(os.path.join(module_dir, name), 'rb') as f:
+                digest.update(f.read())
+        return digest.hexdigest()
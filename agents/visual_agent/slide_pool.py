@@ -0,0 +1,62 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from .constants import *
+from .avatar_manager import AvatarManager
+from .text_utils import TextManager
+from .slide_renderer import SlideRenderer
+from .render_profile import RenderProfile
+
+# Per-worker renderer, built once by the pool initializer
+_worker_renderer: Optional[SlideRenderer] = None
+
+def _init_worker(profile_name: str):
+    """Load fonts and the narrator avatar once per worker process"""
+    global _worker_renderer
+    profile = RenderProfile(profile_name)
+    avatar_manager = AvatarManager()
+    _worker_renderer = SlideRenderer(profile.video_size, avatar_manager,
+                                     TextManager(profile.font_sizes), profile)
+    avatar_manager.load_avatar('female', NARRATOR_AVATAR_ID, profile.avatar_size)
+
+def _render_task(slide: Dict, slide_number: int, total_slides: int, character: Dict,
+                 lesson_title: str, highlight_words: List[str]) -> Tuple[bytes, tuple]:
+    """Render one slide in a worker and hand back its raw RGB bytes instead of a pickled image"""
+    image = _worker_renderer.render_slide(slide, slide_number, total_slides, character,
+                                          lesson_title, highlight_words)
+    frame = np.asarray(image.convert('RGB'))
+    return frame.tobytes(), frame.shape
+
+class SlideRenderPool:
+    """Rasterizes slides in parallel worker processes that keep their fonts and avatars loaded"""
+
+    def __init__(self, workers: int, profile_name: str = RENDER_PROFILE):
+        self.workers = workers
+        self.profile_name = profile_name
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def render(self, jobs: List[Tuple[Dict, int]], total_slides: int, character: Dict,
+               lesson_title: str, highlight_words: List[str]) -> List[np.ndarray]:
+        """Render (slide, slide_number) jobs in parallel; frames come back in job order"""
+        if self._executor is None:
+            # Started lazily and kept for later jobs, so workers load their resources once
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                                 initargs=(self.profile_name,))
+
+        futures = [
+            self._executor.submit(_render_task, slide, slide_number, total_slides, character,
+                                  lesson_title, highlight_words)
+            for slide, slide_number in jobs
+        ]
+
+        frames = []
+        for future in futures:
+            data, shape = future.result()
+            frames.append(np.frombuffer(data, dtype=np.uint8).reshape(shape))
+        return frames
+
+    def close(self):
+        """Shut down the worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
@@ -4,54 +4,81 @@ from .constants import *
 from .avatar_manager import AvatarManager
 from .text_utils import TextManager
 from .ui_components import UIComponents
+from .render_profile import RenderProfile
 from .moviepy_overlay_manager import MoviePyOverlayManager
 
 class SlideRenderer:
     """Renders different types of slides"""
     
     def __init__(self, video_size: Tuple[int, int], avatar_manager: AvatarManager, 
-                 text_manager: TextManager):
+                 text_manager: TextManager, profile: RenderProfile = None):
         self.video_size = video_size
         self.avatar_manager = avatar_manager
         self.text_manager = text_manager
-        self.ui_components = UIComponents(text_manager)
-        self.overlay_manager = MoviePyOverlayManager(VIDEO_SIZE)
+        self.profile = profile or RenderProfile()
+        self.ui_components = UIComponents(text_manager, self.profile)
+        self.overlay_manager = MoviePyOverlayManager(video_size, text_manager, self.profile)
+        # Pre-composited layers and whole title/end slides, keyed per lesson
+        self._layers: Dict[tuple, Image.Image] = {}
+
+    def render_slide(self, slide: Dict, slide_number: int, total_slides: int, character: Dict,
+                     lesson_title: str, highlight_words: list = None) -> Image.Image:
+        """Render a parsed slide with the renderer for its type"""
+        if slide['type'] == 'title':
+            return self.render_title_slide(lesson_title, character)
+        if slide['type'] == 'end':
+            return self.render_end_slide(lesson_title, character)
+        return self.render_content_slide(
+            text=slide['text'],
+            speaker_type=slide['type'],
+            speaker_name=slide.get('speaker_name', ''),
+            character=character,
+            lesson_title=lesson_title,
+            slide_number=slide_number,
+            total_slides=total_slides,
+            highlight_words=highlight_words
+        )
 
     def render_title_slide(self, lesson_title: str, character: Dict) -> Image.Image:
-        """Render title slide with avatar"""
+        """Render title slide with avatar, cached per (character, lesson)"""
+        key = ('title', lesson_title, self._character_key(character))
+        if key not in self._layers:
+            self._layers[key] = self._draw_title_slide(lesson_title, character)
+        return self._layers[key].copy()
+
+    def _draw_title_slide(self, lesson_title: str, character: Dict) -> Image.Image:
+        px = self.profile.px
+        header_height = self.profile.header_height_title
+        avatar_size = self.profile.avatar_size_title
         img = Image.new('RGB', self.video_size, COLORS['background'])
         draw = ImageDraw.Draw(img)
         
         # Header
-        draw.rectangle([0, 0, self.video_size[0], HEADER_HEIGHT_TITLE], fill=COLORS['header_bg'])
+        draw.rectangle([0, 0, self.video_size[0], header_height], fill=COLORS['header_bg'])
         
         # Title
-        title_lines = self.text_manager.wrap_text(lesson_title, 'title', self.video_size[0] - 160)
+        title_lines = self.text_manager.wrap_text(lesson_title, 'title', self.video_size[0] - px(160))
         title_text = '\n'.join(title_lines)
         
         title_width, title_height = self.text_manager.get_text_dimensions(title_text, 'title')
         title_x = (self.video_size[0] - title_width) // 2
-        title_y = (HEADER_HEIGHT_TITLE - title_height) // 2
+        title_y = (header_height - title_height) // 2
         
         font = self.text_manager.get_font('title')
         draw.text((title_x, title_y), title_text, font=font, 
                  fill=COLORS['title_text'], align='center')
         
         # Avatar
-        avatar = self.avatar_manager.get_avatar(character, size=AVATAR_SIZE_TITLE)
-        avatar_x = (self.video_size[0] - AVATAR_SIZE_TITLE) // 2
-        avatar_y = HEADER_HEIGHT_TITLE + 40
-        
-        img_rgba = img.convert('RGBA')
-        img_rgba.paste(avatar, (avatar_x, avatar_y), avatar)
-        img = img_rgba.convert('RGB')
-        draw = ImageDraw.Draw(img)
+        avatar = self.avatar_manager.get_avatar(character, size=avatar_size)
+        avatar_x = (self.video_size[0] - avatar_size) // 2
+        avatar_y = header_height + px(40)
+        img.paste(avatar, (avatar_x, avatar_y), avatar)
         
         # Presenter info
         presenter_text = f"YOUR GUIDE: {character['name'].upper()}"
         text_width, text_height = self.text_manager.get_text_dimensions(presenter_text, 'speaker')
         text_x = (self.video_size[0] - text_width) // 2
-        text_y = avatar_y + AVATAR_SIZE_TITLE + 30
+        text_y = avatar_y + avatar_size + px(30)
         
         self.ui_components.draw_badge(draw, presenter_text, (text_x, text_y), 'character')
         
@@ -63,60 +90,49 @@ class SlideRenderer:
                             highlight_words: list = None,
                             ) -> Image.Image:
         """Render content slide with large avatar taking half screen and in-bubble highlights."""
-        img = Image.new('RGB', self.video_size, COLORS['background'])
-        draw = ImageDraw.Draw(img)
-
         highlight_words = highlight_words or []
+        is_character = speaker_type == 'character'
+        layout = self.profile.layout
+        px = self.profile.px
 
-        # Header
-        self.ui_components.draw_header(draw, lesson_title, self.video_size)
-        content_top = LAYOUT['header_height'] + 20
-        content_bottom = self.video_size[1] - LAYOUT['footer_height'] - 20
-        content_height = content_bottom - content_top
+        # Header, footer track, avatar and badge come pre-composited for this speaker side
+        img = self._content_base(is_character, speaker_name, character, lesson_title).copy()
+        draw = ImageDraw.Draw(img)
 
-        # Side
-        is_character = speaker_type == 'character'
+        content_top, content_bottom = self._content_bounds()
+        avatar_x, avatar_y = self._avatar_position(is_character)
         screen_mid = self.video_size[0] // 2
-        if is_character:
-            avatar_x = screen_mid // 2 - LAYOUT['avatar_size'] // 2
-            bubble_side = 'right'
-        else:
-            avatar_x = screen_mid + screen_mid // 2 - LAYOUT['avatar_size'] // 2
-            bubble_side = 'left'
-        avatar_y = content_top + (content_height - LAYOUT['avatar_size']) // 2 - 40
-        avatar = self.avatar_manager.get_avatar(character, is_narrator=(not is_character),
-                                            narrator_avatar_id=NARRATOR_AVATAR_ID)
-        img_rgba = img.convert('RGBA')
-        img_rgba.paste(avatar, (avatar_x, avatar_y), avatar)
-        img = img_rgba.convert('RGB')
-        draw = ImageDraw.Draw(img)
+        bubble_side = 'right' if is_character else 'left'
 
         # Bubble
         if bubble_side == 'right':
-            bubble_area_start = screen_mid + 20
-            bubble_area_end = self.video_size[0] - LAYOUT['margin']
+            bubble_area_start = screen_mid + px(20)
+            bubble_area_end = self.video_size[0] - layout['margin']
         else:
-            bubble_area_start = LAYOUT['margin']
-            bubble_area_end = screen_mid - 30
+            bubble_area_start = layout['margin']
+            bubble_area_end = screen_mid - px(30)
         bubble_area_width = bubble_area_end - bubble_area_start
-        max_text_width = bubble_area_width - LAYOUT['bubble_padding'] * 2 - 40
-        wrapped_lines = self.text_manager.wrap_text(text, 'body', max_text_width)
-        text_width, text_height = self.text_manager.get_multiline_dimensions(
-            wrapped_lines, 'body', LAYOUT['line_spacing'])
-        bubble_width = min(text_width + LAYOUT['bubble_padding'] * 2, bubble_area_width - 20)
-        bubble_height = text_height + LAYOUT['bubble_padding'] * 2
+        max_text_width = bubble_area_width - layout['bubble_padding'] * 2 - px(40)
+        max_text_height = content_bottom - content_top - px(40) - layout['bubble_padding'] * 2
+        # Long text steps down from the body size until the bubble fits between header and footer
+        font, wrapped_lines = self.text_manager.fit_text(
+            text, 'body', max_text_width, max_text_height, layout['line_spacing'],
+            self.profile.body_font_min_size)
+        text_width, text_height = self.text_manager.get_lines_dimensions(
+            wrapped_lines, font, layout['line_spacing'])
+        bubble_width = min(text_width + layout['bubble_padding'] * 2, bubble_area_width - px(20))
+        bubble_height = text_height + layout['bubble_padding'] * 2
         bubble_x = bubble_area_start + (bubble_area_width - bubble_width) // 2
-        bubble_y = avatar_y + (LAYOUT['avatar_size'] - bubble_height) // 2
-        if bubble_y < content_top + 20:
-            bubble_y = content_top + 20
-        if bubble_y + bubble_height > content_bottom - 20:
-            bubble_y = content_bottom - bubble_height - 20
+        bubble_y = avatar_y + (layout['avatar_size'] - bubble_height) // 2
+        if bubble_y < content_top + px(20):
+            bubble_y = content_top + px(20)
+        if bubble_y + bubble_height > content_bottom - px(20):
+            bubble_y = content_bottom - bubble_height - px(20)
         bubble_rect = [bubble_x, bubble_y, bubble_x + bubble_width, bubble_y + bubble_height]
 
         # Draw bubble with text (no highlights yet)
         self.ui_components.draw_speech_bubble(draw, bubble_rect, is_character)
 
-        font = self.text_manager.get_font('body')
         self.ui_components.draw_highlighted_text_with_phrases(
             img, bubble_rect, wrapped_lines, highlight_words, font
         )
@@ -124,23 +140,73 @@ class SlideRenderer:
         bubble_fill = COLORS['character_bubble'] if is_character else COLORS['narrator_bubble']
         bubble_outline = COLORS['character_border'] if is_character else COLORS['narrator_border']
         self.ui_components.draw_speech_tail(draw, bubble_rect, bubble_side, 
-                                        avatar_x, avatar_y, LAYOUT['avatar_size'],
+                                        avatar_x, avatar_y, layout['avatar_size'],
                                         bubble_fill, bubble_outline)
 
-        # Speaker badge
+        # Footer
+        self.ui_components.draw_footer_progress(draw, slide_number, total_slides, self.video_size)
+        return img
+
+    def _content_base(self, is_character: bool, speaker_name: str, character: Dict,
+                      lesson_title: str) -> Image.Image:
+        """Static layers shared by every content slide of one speaker side in a lesson"""
         name_text = speaker_name if is_character else "Narrator"
+        key = ('content', lesson_title, self._character_key(character), is_character, name_text)
+        if key in self._layers:
+            return self._layers[key]
+
+        img = Image.new('RGB', self.video_size, COLORS['background'])
+        draw = ImageDraw.Draw(img)
+
+        # Header
+        self.ui_components.draw_header(draw, lesson_title, self.video_size)
+
+        # Avatar
+        avatar_x, avatar_y = self._avatar_position(is_character)
+        avatar_size = self.profile.avatar_size
+        avatar = self.avatar_manager.get_avatar(character, is_narrator=(not is_character),
+                                            narrator_avatar_id=NARRATOR_AVATAR_ID, size=avatar_size)
+        img.paste(avatar, (avatar_x, avatar_y), avatar)
+
+        # Speaker badge
         name_width, name_height = self.text_manager.get_text_dimensions(name_text, 'speaker')
-        name_x = avatar_x + (LAYOUT['avatar_size'] - name_width) // 2
-        name_y = avatar_y + LAYOUT['avatar_size'] + 15
+        name_x = avatar_x + (avatar_size - name_width) // 2
+        name_y = avatar_y + avatar_size + self.profile.px(15)
         self.ui_components.draw_badge(draw, name_text, (name_x, name_y), 
                                     'character' if is_character else 'narrator')
 
-        # Footer
-        self.ui_components.draw_footer(draw, slide_number, total_slides, self.video_size)
+        # Footer track
+        self.ui_components.draw_footer_track(draw, self.video_size)
+
+        self._layers[key] = img
         return img
 
-    def render_end_slide(self, lesson_title: str) -> Image.Image:
-        """Render end slide"""
+    def _content_bounds(self) -> Tuple[int, int]:
+        layout = self.profile.layout
+        content_top = layout['header_height'] + self.profile.px(20)
+        content_bottom = self.video_size[1] - layout['footer_height'] - self.profile.px(20)
+        return content_top, content_bottom
+
+    def _avatar_position(self, is_character: bool) -> Tuple[int, int]:
+        """Top-left corner of the large avatar: left half for the character, right half for the narrator"""
+        content_top, content_bottom = self._content_bounds()
+        avatar_size = self.profile.avatar_size
+        screen_mid = self.video_size[0] // 2
+        if is_character:
+            avatar_x = screen_mid // 2 - avatar_size // 2
+        else:
+            avatar_x = screen_mid + screen_mid // 2 - avatar_size // 2
+        avatar_y = content_top + (content_bottom - content_top - avatar_size) // 2 - self.profile.px(40)
+        return avatar_x, avatar_y
+
+    def render_end_slide(self, lesson_title: str, character: Dict = None) -> Image.Image:
+        """Render end slide, cached per (character, lesson)"""
+        key = ('end', lesson_title, self._character_key(character) if character else None)
+        if key not in self._layers:
+            self._layers[key] = self._draw_end_slide(lesson_title)
+        return self._layers[key].copy()
+
+    def _draw_end_slide(self, lesson_title: str) -> Image.Image:
         img = Image.new('RGB', self.video_size, COLORS['background'])
         draw = ImageDraw.Draw(img)
         
@@ -148,7 +214,7 @@ class SlideRenderer:
         thank_you_text = "Thank you for learning with us!"
         text_width, text_height = self.text_manager.get_text_dimensions(thank_you_text, 'title')
         text_x = (self.video_size[0] - text_width) // 2
-        text_y = self.video_size[1] // 2 - 80
+        text_y = self.video_size[1] // 2 - self.profile.px(80)
         
         font = self.text_manager.get_font('title')
         draw.text((text_x, text_y), thank_you_text, font=font, fill=COLORS['header_bg'])
@@ -157,8 +223,16 @@ class SlideRenderer:
         badge_text = f"Lesson Completed: {lesson_title}"
         badge_width, badge_height = self.text_manager.get_text_dimensions(badge_text, 'speaker')
         badge_x = (self.video_size[0] - badge_width) // 2
-        badge_y = text_y + text_height + 60
+        badge_y = text_y + text_height + self.profile.px(60)
         
         self.ui_components.draw_badge(draw, badge_text, (badge_x, badge_y), 'character')
         
-        return img
\ No newline at end of file
+        return img
+
+    @staticmethod
+    def _character_key(character: Dict) -> tuple:
+        return (character['name'], character['gender'], character.get('avatar_id', 1))
+
+    def clear_cache(self):
+        """Drop the cached base layers"""
+        self._layers.clear()
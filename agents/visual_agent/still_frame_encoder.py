@@ -0,0 +1,186 @@
+import os
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+import numpy as np
+from PIL import Image
+from moviepy.config import get_setting
+from .constants import *
+from .encoding import EncodingSettings
+
+class StillFrameEncoder:
+    """Encodes held still frames with ffmpeg's concat demuxer instead of per-frame compositing"""
+
+    def __init__(self, fps: int = FPS, workers: int = ENCODE_WORKERS,
+                 encoding: Optional[EncodingSettings] = None):
+        self.fps = fps
+        self.workers = workers or os.cpu_count() or 1
+        self.encoding = encoding or EncodingSettings(fps)
+        self.ffmpeg_binary = get_setting("FFMPEG_BINARY")
+
+    def encode(self, segments: Iterable[Tuple[Hashable, np.ndarray, int]], audio_path: str,
+               output_path: str, boundaries: Optional[List[int]] = None):
+        """
+        Encode (state_key, frame, frame_count) segments muxed with the voice track.
+        Each distinct state is written once and held by ffmpeg for frame_count frames.
+        With several workers the segments are split at the given boundaries (segment
+        indices where a slide starts) and the chunks are encoded in parallel. Keyframes are
+        forced at the same slide starts.
+        """
+        boundaries = boundaries or []
+        with tempfile.TemporaryDirectory(prefix="stills_") as temp_dir:
+            records = self._write_frames(segments, temp_dir)
+            total_frames = sum(count for _, count in records)
+            chunks = self._split_chunks(records, boundaries, self.workers)
+            print(f"🧊 Encoding {len(records)} still segments ({total_frames} frames) "
+                  f"in {len(chunks)} chunk(s) with ffmpeg...")
+
+            if len(chunks) == 1:
+                list_path = self._write_concat_list(records, temp_dir, "stills")
+                keyframes = self._keyframes(records, boundaries, 0, len(records))
+                self._run(self._build_command(list_path, audio_path, output_path, total_frames, keyframes))
+            else:
+                self._encode_chunks(records, chunks, boundaries, audio_path, output_path, temp_dir)
+
+        return output_path
+
+    def _encode_chunks(self, records: List[Tuple[str, int]], chunks: List[Tuple[int, int]],
+                       boundaries: List[int], audio_path: str, output_path: str, temp_dir: str):
+        """Encode chunks in parallel with identical settings, then join them with stream copy"""
+        commands, chunk_paths = [], []
+        # The encoder thread budget is shared by the chunks running at once instead of multiplied by them
+        threads = max(1, VIDEO_THREADS // min(self.workers, len(chunks)))
+        for i, (start, end) in enumerate(chunks):
+            chunk_records = records[start:end]
+            list_path = self._write_concat_list(chunk_records, temp_dir, f"chunk_{i:03d}")
+            chunk_path = os.path.join(temp_dir, f"chunk_{i:03d}.mp4")
+            chunk_frames = sum(count for _, count in chunk_records)
+            keyframes = self._keyframes(records, boundaries, start, end)
+            commands.append(self._build_command(list_path, None, chunk_path, chunk_frames, keyframes, threads))
+            chunk_paths.append(chunk_path)
+
+        # Each chunk is its own ffmpeg process, so threads are enough to keep every core busy
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            list(executor.map(self._run, commands))
+
+        joined_list = os.path.join(temp_dir, "chunks.ffconcat")
+        with open(joined_list, 'w') as f:
+            f.write("ffconcat version 1.0\n" + "".join(f"file '{path}'\n" for path in chunk_paths))
+
+        self._run(self._build_join_command(joined_list, audio_path, output_path))
+
+    @staticmethod
+    def _split_chunks(records: List[Tuple[str, int]], boundaries: List[int],
+                      n_chunks: int) -> List[Tuple[int, int]]:
+        """Split record indices into up to n_chunks ranges of similar length, cutting only at boundaries"""
+        if n_chunks <= 1 or not boundaries:
+            return [(0, len(records))]
+
+        total_frames = sum(count for _, count in records)
+        target = total_frames / n_chunks
+        cut_points = set(b for b in boundaries if 0 < b < len(records))
+
+        chunks = []
+        chunk_start, frames_so_far = 0, 0
+        for i, (_, count) in enumerate(records):
+            if i in cut_points and frames_so_far >= target * (len(chunks) + 1) and len(chunks) < n_chunks - 1:
+                chunks.append((chunk_start, i))
+                chunk_start = i
+            frames_so_far += count
+        chunks.append((chunk_start, len(records)))
+        return chunks
+
+    @staticmethod
+    def _keyframes(records: List[Tuple[str, int]], boundaries: List[int], start: int, end: int) -> List[int]:
+        """Frame numbers, relative to record start, where slides between start and end begin"""
+        cut_points = set(boundaries)
+        keyframes, frame = [], 0
+        for i in range(start, end):
+            if i in cut_points:
+                keyframes.append(frame)
+            frame += records[i][1]
+        return keyframes
+
+    def _write_frames(self, segments: Iterable[Tuple[Hashable, np.ndarray, int]],
+                      temp_dir: str) -> List[Tuple[str, int]]:
+        """Write each distinct state once as it arrives; returns (frame_path, frame_count) records"""
+        written: Dict[Hashable, str] = {}
+        records = []
+        for key, frame, count in segments:
+            if key not in written:
+                frame_path = os.path.join(temp_dir, f"still_{len(written):05d}.png")
+                Image.fromarray(frame).save(frame_path, compress_level=1)
+                written[key] = frame_path
+            records.append((written[key], count))
+        return records
+
+    def _write_concat_list(self, records: List[Tuple[str, int]], temp_dir: str, name: str) -> str:
+        """Write an ffconcat list holding each still for its exact duration"""
+        entries = [
+            f"file '{frame_path}'\nduration {count / self.fps:.6f}"
+            for frame_path, count in records
+        ]
+
+        # The concat demuxer ignores the duration of the last entry unless the file is repeated
+        if records:
+            entries.append(f"file '{records[-1][0]}'")
+
+        list_path = os.path.join(temp_dir, f"{name}.ffconcat")
+        with open(list_path, 'w') as f:
+            f.write("ffconcat version 1.0\n" + "\n".join(entries) + "\n")
+        return list_path
+
+    def _build_command(self, list_path: str, audio_path: Optional[str], output_path: str,
+                       total_frames: int, keyframes: List[int] = (), threads: int = VIDEO_THREADS) -> List[str]:
+        """Build the ffmpeg command using the same codec settings as the MoviePy path"""
+        cmd = [
+            self.ffmpeg_binary, '-y', '-loglevel', 'error',
+            '-f', 'concat', '-safe', '0', '-i', list_path,
+        ]
+        if audio_path:
+            cmd += ['-i', audio_path, '-map', '0:v:0', '-map', '1:a:0']
+
+        # Convert each still to yuv420p once, before the fps filter duplicates it
+        cmd += [
+            '-vf', f'format=yuv420p,fps={self.fps}',
+            '-frames:v', str(total_frames),
+            '-vcodec', VIDEO_CODEC,
+            '-preset', self.encoding.preset,
+            *self.encoding.rate_args(),
+            *self.encoding.tuning_args(keyframes),
+            '-threads', str(threads),
+            '-pix_fmt', 'yuv420p',
+        ]
+        if audio_path:
+            cmd += self._audio_args()
+        else:
+            cmd.append('-an')
+
+        cmd.append(output_path)
+        return cmd
+
+    def _build_join_command(self, list_path: str, audio_path: Optional[str], output_path: str) -> List[str]:
+        """Join encoded chunks losslessly and mux the voice track"""
+        cmd = [
+            self.ffmpeg_binary, '-y', '-loglevel', 'error',
+            '-f', 'concat', '-safe', '0', '-i', list_path,
+        ]
+        if audio_path:
+            cmd += ['-i', audio_path, '-map', '0:v:0', '-map', '1:a:0']
+
+        cmd += ['-vcodec', 'copy']
+        cmd += self._audio_args() if audio_path else ['-an']
+        cmd.append(output_path)
+        return cmd
+
+    @staticmethod
+    def _audio_args() -> List[str]:
+        return ['-acodec', AUDIO_CODEC, '-ar', str(AUDIO_FPS), '-ac', '2']
+
+    def _run(self, cmd: List[str]):
+        """Run ffmpeg and surface its error output on failure"""
+        process = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        if process.returncode != 0:
+            error = process.stderr.decode('utf8', errors='ignore')
+            raise IOError(f"ffmpeg still-frame encoding failed:\n{error}")
@@ -0,0 +1,183 @@
+import math
+import numpy as np
+from PIL import Image, ImageColor, ImageDraw, ImageFont
+from typing import Dict, Optional, Tuple
+
+_text_rasterizer: Optional["TextRasterizer"] = None
+
+def get_text_rasterizer() -> "TextRasterizer":
+    """Process-wide rasterizer, so glyph atlases are shared by every slide, sprite and lesson"""
+    global _text_rasterizer
+    if _text_rasterizer is None:
+        _text_rasterizer = TextRasterizer()
+    return _text_rasterizer
+
+class TextRasterizer:
+    """
+    Draws single lines of text from per-font glyph atlases instead of asking FreeType for
+    every glyph on every call. Glyph coverage masks are rendered once per (font, character,
+    vertical subpixel offset), placed with the font's own advances and kerning, merged the way
+    Pillow merges a string's glyphs and alpha-blended into the frame with numpy using Pillow's
+    integer blend, so the output matches ImageDraw.text pixel for pixel.
+    """
+
+    def __init__(self):
+        # font -> {(char, y fraction): (coverage mask, (x, y) offset from the text origin)}
+        self._atlases: Dict[ImageFont.FreeTypeFont, Dict[tuple, Tuple[np.ndarray, Tuple[int, int]]]] = {}
+        self._advances: Dict[tuple, float] = {}
+        self.glyphs_rendered = 0
+        self.fallbacks = 0
+
+    def draw(self, img: Image.Image, xy: Tuple[float, float], text: str, font, fill):
+        """Draw one line of text onto a PIL image, like ImageDraw.text with the default anchor"""
+        coverage = self._coverage(text, font, xy) if img.mode in ('RGB', 'RGBA') else None
+        if coverage is None:
+            self.fallbacks += 1
+            ImageDraw.Draw(img).text(xy, text, font=font, fill=fill)
+            return
+
+        mask, (left, top) = coverage
+        box = self._clip(left, top, mask.shape, img.size)
+        if box is None:
+            return
+        x0, y0, x1, y1 = box
+        region = np.array(img.crop(box))
+        self._blend(region, mask[y0 - top:y1 - top, x0 - left:x1 - left], self._ink(fill, img.mode))
+        img.paste(Image.fromarray(region, img.mode), box)
+
+    def draw_array(self, frame: np.ndarray, xy: Tuple[float, float], text: str, font, fill):
+        """Draw one line of text into an RGB or RGBA numpy frame in place"""
+        mode = 'RGBA' if frame.shape[2] == 4 else 'RGB'
+        coverage = self._coverage(text, font, xy)
+        if coverage is None:
+            self.fallbacks += 1
+            img = Image.fromarray(frame, mode)
+            ImageDraw.Draw(img).text(xy, text, font=font, fill=fill)
+            frame[...] = np.asarray(img)
+            return
+
+        mask, (left, top) = coverage
+        box = self._clip(left, top, mask.shape, (frame.shape[1], frame.shape[0]))
+        if box is None:
+            return
+        x0, y0, x1, y1 = box
+        self._blend(frame[y0:y1, x0:x1], mask[y0 - top:y1 - top, x0 - left:x1 - left], self._ink(fill, mode))
+
+    def stats(self) -> Dict:
+        return {
+            'fonts': len(self._atlases),
+            'glyphs': sum(len(atlas) for atlas in self._atlases.values()),
+            'glyphs_rendered': self.glyphs_rendered,
+            'fallbacks': self.fallbacks,
+        }
+
+    def _coverage(self, text: str, font, xy: Tuple[float, float]) -> Optional[Tuple[np.ndarray, Tuple[int, int]]]:
+        """Merged coverage mask of a line and its top-left corner in frame pixels, or None to fall back"""
+        # Pillow splits a negative origin toward zero, which the per-glyph atlas cannot reproduce,
+        # so text starting off the left or top edge is drawn by Pillow
+        if not self._supports(text, font) or xy[0] < 0 or xy[1] < 0:
+            return None
+
+        origin_x, origin_y = int(xy[0]), int(xy[1])
+        # The horizontal fraction shifts the pen before rounding; the vertical one is rendered into each glyph
+        pen_start = int(round(math.modf(xy[0])[0] * 64))
+        start_y = math.modf(xy[1])[0]
+        atlas = self._atlases.setdefault(font, {})
+
+        # Pen positions in 26.6 fixed point, rounded to whole pixels the way FreeType places glyphs
+        placed = []
+        pen = 0.0
+        previous = None
+        for char in text:
+            if previous is not None:
+                pen += self._kerning(previous, char, font)
+            glyph = atlas.get((char, start_y))
+            if glyph is None:
+                glyph = atlas[(char, start_y)] = self._render_glyph(char, font, start_y)
+            mask, (offset_x, offset_y) = glyph
+            if mask.size:
+                placed.append((mask, offset_x + ((pen_start + int(round(pen * 64)) + 32) >> 6), offset_y))
+            pen += self._advance(char, font)
+            previous = char
+
+        if not placed:
+            return None
+
+        left = min(x for _, x, _ in placed)
+        top = min(y for _, _, y in placed)
+        right = max(x + mask.shape[1] for mask, x, _ in placed)
+        bottom = max(y + mask.shape[0] for mask, _, y in placed)
+
+        # Later glyphs are composited over earlier ones, as Pillow builds a string's mask
+        line = np.zeros((bottom - top, right - left), dtype=np.uint32)
+        for mask, x, y in placed:
+            target = line[y - top:y - top + mask.shape[0], x - left:x - left + mask.shape[1]]
+            target[...] = mask + self._div255(target * (255 - mask.astype(np.uint32)))
+        return line, (origin_x + left, origin_y + top)
+
+    @staticmethod
+    def _supports(text: str, font) -> bool:
+        """Plain FreeType fonts with basic layout only; multiline text and shaping go to Pillow"""
+        return (
+            isinstance(font, ImageFont.FreeTypeFont)
+            and font.layout_engine == ImageFont.Layout.BASIC
+            and '\n' not in text and '\r' not in text
+        )
+
+    def _render_glyph(self, char: str, font, start_y: float) -> Tuple[np.ndarray, Tuple[int, int]]:
+        """Rasterize one glyph with Pillow onto a blank coverage canvas and trim it to its ink"""
+        self.glyphs_rendered += 1
+        left, top, right, bottom = font.getbbox(char)
+        pad = 2  # Room for the subpixel offset and rounding on every side
+        # The origin must stay non-negative: Pillow splits it into whole pixels and a fraction
+        origin = (pad + max(-left, 0), pad + max(-top, 0))
+        canvas = Image.new('L', (origin[0] + right + pad, origin[1] + bottom + pad), 0)
+        ImageDraw.Draw(canvas).text((origin[0], origin[1] + start_y), char, font=font, fill=255)
+
+        ink = canvas.getbbox()
+        if ink is None:
+            return np.zeros((0, 0), dtype=np.uint8), (0, 0)
+        return np.array(canvas.crop(ink)), (ink[0] - origin[0], ink[1] - origin[1])
+
+    def _advance(self, char: str, font) -> float:
+        key = (char, font)
+        if key not in self._advances:
+            self._advances[key] = font.getlength(char)
+        return self._advances[key]
+
+    def _kerning(self, first: str, second: str, font) -> float:
+        key = (first + second, font)
+        if key not in self._advances:
+            self._advances[key] = font.getlength(first + second) - self._advance(first, font) - self._advance(second, font)
+        return self._advances[key]
+
+    @staticmethod
+    def _clip(left: int, top: int, shape: tuple, size: Tuple[int, int]) -> Optional[Tuple[int, int, int, int]]:
+        x0, y0 = max(left, 0), max(top, 0)
+        x1, y1 = min(left + shape[1], size[0]), min(top + shape[0], size[1])
+        if x0 >= x1 or y0 >= y1:
+            return None
+        return x0, y0, x1, y1
+
+    @staticmethod
+    def _ink(fill, mode: str) -> np.ndarray:
+        ink = ImageColor.getcolor(fill, mode) if isinstance(fill, str) else tuple(fill)
+        if mode == 'RGBA' and len(ink) == 3:
+            ink += (255,)
+        return np.array(ink[:len(mode)], dtype=np.uint32)
+
+    @staticmethod
+    def _blend(region: np.ndarray, mask: np.ndarray, ink: np.ndarray):
+        """Pillow's fill-with-mask blend: (bg * (255 - m) + ink * m) / 255 with its integer rounding"""
+        coverage = np.repeat(mask[..., np.newaxis], len(ink), axis=2)
+        if len(ink) == 4:
+            # Pillow paints the ink color as-is onto fully transparent pixels; only alpha is blended
+            transparent = (region[..., 3] == 0) & (mask > 0)
+            coverage[..., :3][transparent] = 255
+        region[...] = TextRasterizer._div255(region * (255 - coverage) + ink * coverage)
+
+    @staticmethod
+    def _div255(values: np.ndarray) -> np.ndarray:
+        """Rounded division by 255 in integers, as Pillow's DIV255"""
+        values = values + 128
+        return ((values >> 8) + values) >> 8
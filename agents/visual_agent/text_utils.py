@@ -1,17 +1,31 @@
 from PIL import Image, ImageDraw, ImageFont
+from collections import OrderedDict
 from typing import Dict, List, Optional, Tuple
-from .constants import FONT_PATHS, FONT_SIZES
+from .constants import FONT_PATHS, FONT_SIZES, TEXT_LAYOUT_CACHE_SIZE, TEXT_RASTERIZER, WRAP_CHECK_MARGIN
+from .font_registry import get_font_registry
+from .text_rasterizer import get_text_rasterizer
 
 class TextManager:
     """Manages font loading and text operations"""
     
-    def __init__(self):
+    def __init__(self, font_sizes: Dict[str, int] = None):
+        self.font_sizes = font_sizes or FONT_SIZES
         self.fonts = self._load_fonts()
+        self._sized_fonts: Dict[Tuple[str, int], ImageFont.FreeTypeFont] = {}
+        # Measurement caches shared by wrapping and the dimension helpers
+        self._words: Dict[tuple, tuple] = {}
+        self._space_widths: Dict[ImageFont.FreeTypeFont, float] = {}
+        self._sizes: Dict[tuple, Tuple[int, int]] = {}
+        self._kerning_pairs: Dict[tuple, float] = {}
+        self._fits: Dict[tuple, int] = {}
+        self._layouts: "OrderedDict[tuple, List[str]]" = OrderedDict()
         self._temp_img = Image.new('RGB', (1, 1))
         self._temp_draw = ImageDraw.Draw(self._temp_img)
+        self.rasterizer = get_text_rasterizer() if TEXT_RASTERIZER == 'atlas' else None
     
     def _load_fonts(self) -> Dict[str, Optional[ImageFont.FreeTypeFont]]:
-        """Load fonts with fallbacks"""
+        """Load fonts with fallbacks from the process-wide registry"""
+        registry = get_font_registry()
         fonts = {}
         
         for font_type, paths in FONT_PATHS.items():
@@ -19,24 +33,24 @@ class TextManager:
             for path in paths:
                 try:
                     if font_type == 'title':
-                        fonts['title'] = ImageFont.truetype(path, FONT_SIZES['title'], 
-                                                           index=1 if 'Helvetica' in path else 0)
-                        fonts['speaker'] = ImageFont.truetype(path, FONT_SIZES['speaker'], 
-                                                             index=1 if 'Helvetica' in path else 0)
+                        index = 1 if 'Helvetica' in path else 0
+                        fonts['title'] = registry.get(path, self.font_sizes['title'], index)
+                        fonts['speaker'] = registry.get(path, self.font_sizes['speaker'], index)
                     else:
-                        fonts['body'] = ImageFont.truetype(path, FONT_SIZES['body'])
-                        fonts['progress'] = ImageFont.truetype(path, FONT_SIZES['progress'])
+                        fonts['body'] = registry.get(path, self.font_sizes['body'])
+                        fonts['progress'] = registry.get(path, self.font_sizes['progress'])
                     loaded = True
                     break
-                except:
+                except OSError:
                     continue
             
             if not loaded:
                 print(f"⚠️ Using default font for {font_type}")
-                fonts['title'] = ImageFont.load_default()
-                fonts['body'] = ImageFont.load_default()
-                fonts['speaker'] = ImageFont.load_default()
-                fonts['progress'] = ImageFont.load_default()
+                default = registry.default()
+                fonts['title'] = default
+                fonts['body'] = default
+                fonts['speaker'] = default
+                fonts['progress'] = default
                 
         return fonts
     
@@ -44,24 +58,110 @@ class TextManager:
         """Get font by type"""
         return self.fonts.get(font_type, self.fonts['body'])
     
+    def get_sized_font(self, font_type: str, size: int) -> ImageFont.FreeTypeFont:
+        """Get a font of the given type at an arbitrary size"""
+        key = (font_type, size)
+        if key not in self._sized_fonts:
+            font = self.get_font(font_type)
+            self._sized_fonts[key] = font if size == getattr(font, 'size', None) else get_font_registry().variant(font, size)
+        return self._sized_fonts[key]
+    
+    def draw_text(self, img: Image.Image, xy: Tuple[float, float], text: str,
+                  font: ImageFont.FreeTypeFont, fill):
+        """Draw a single line of text with the glyph atlas, or with Pillow when it is disabled"""
+        if self.rasterizer is not None:
+            self.rasterizer.draw(img, xy, text, font, fill)
+        else:
+            ImageDraw.Draw(img).text(xy, text, font=font, fill=fill)
+    
     def wrap_text(self, text: str, font_type: str, max_width: int) -> List[str]:
         """Wrap text to fit within max_width"""
-        font = self.get_font(font_type)
-        words = text.split()
+        return self.wrap_text_with_font(text, self.get_font(font_type), max_width)
+    
+    def wrap_text_with_font(self, text: str, font: ImageFont.FreeTypeFont, max_width: int) -> List[str]:
+        """Wrap text to fit within max_width using a specific font"""
+        key = (text, font, max_width)
+        if key in self._layouts:
+            self._layouts.move_to_end(key)
+            return list(self._layouts[key])
+
+        lines = self._pack_lines(text.split(), font, max_width)
+        self._layouts[key] = lines
+        if len(self._layouts) > TEXT_LAYOUT_CACHE_SIZE:
+            self._layouts.popitem(last=False)
+        return list(lines)
+    
+    def fit_text(self, text: str, font_type: str, max_width: int, max_height: float,
+                 line_spacing: float, min_size: int) -> Tuple[ImageFont.FreeTypeFont, List[str]]:
+        """
+        Largest size of font_type, up to its configured size, whose wrapped text fits the box.
+        Sizes are binary-searched and the chosen size is memoized; if even min_size overflows,
+        min_size is used. Returns the font and its wrapped lines.
+        """
+        base = self.get_font(font_type)
+        max_size = getattr(base, 'size', None)
+        if max_size is None:
+            return base, self.wrap_text_with_font(text, base, max_width)
+        
+        key = (text, font_type, max_width, max_height, line_spacing, min_size)
+        size = self._fits.get(key)
+        if size is None:
+            low = min(min_size, max_size)
+            size = max_size
+            if not self._fits_box(text, font_type, size, max_width, max_height, line_spacing):
+                # Smaller sizes wrap into fewer, shorter lines, so fitting is monotonic in size
+                size, high = low, max_size - 1
+                while low <= high:
+                    mid = (low + high) // 2
+                    if self._fits_box(text, font_type, mid, max_width, max_height, line_spacing):
+                        size, low = mid, mid + 1
+                    else:
+                        high = mid - 1
+            self._fits[key] = size
+            if len(self._fits) > TEXT_LAYOUT_CACHE_SIZE:
+                self._fits.clear()
+        
+        font = self.get_sized_font(font_type, size)
+        return font, self.wrap_text_with_font(text, font, max_width)
+    
+    def _fits_box(self, text: str, font_type: str, size: int, max_width: int,
+                  max_height: float, line_spacing: float) -> bool:
+        font = self.get_sized_font(font_type, size)
+        lines = self.wrap_text_with_font(text, font, max_width)
+        width, height = self.get_lines_dimensions(lines, font, line_spacing)
+        return width <= max_width and height <= max_height
+    
+    def _pack_lines(self, words: List[str], font: ImageFont.FreeTypeFont, max_width: int) -> List[str]:
+        """
+        Greedy line packing in one pass over the words. Each line's width is extended from
+        cached word advances instead of re-measuring the whole line; only widths within
+        WRAP_CHECK_MARGIN of the limit are re-measured exactly, so breaks match textbbox.
+        """
+        space = self._space_width(font)
         lines = []
         current_line = []
+        line_left = line_advance = 0.0
         
         for word in words:
-            test_line = ' '.join(current_line + [word])
-            bbox = self._temp_draw.textbbox((0, 0), test_line, font=font)
-            test_width = bbox[2] - bbox[0]
+            advance, (left, _, right, _) = self._word_metrics(word, font)
+            
+            if current_line:
+                test_width = line_advance + space + right - line_left
+            else:
+                test_width = right - left
+            if abs(test_width - max_width) <= WRAP_CHECK_MARGIN:
+                test_width = self.measure(' '.join(current_line + [word]), font)[0]
             
             if test_width <= max_width:
+                if not current_line:
+                    line_left, line_advance = left, -space
                 current_line.append(word)
+                line_advance += space + advance
             else:
                 if current_line:
                     lines.append(' '.join(current_line))
                     current_line = [word]
+                    line_left, line_advance = left, advance
                 else:
                     lines.append(word)
                     current_line = []
@@ -71,24 +171,84 @@ class TextManager:
         
         return lines
     
+    def _word_metrics(self, word: str, font: ImageFont.FreeTypeFont) -> Tuple[float, Tuple[int, int, int, int]]:
+        """Advance width and ink box of a word, measured once per font"""
+        key = (word, font)
+        metrics = self._words.get(key)
+        if metrics is None:
+            metrics = (font.getlength(word), self._temp_draw.textbbox((0, 0), word, font=font))
+            self._words[key] = metrics
+            if len(self._words) > TEXT_LAYOUT_CACHE_SIZE:
+                self._words.clear()
+        return metrics
+    
+    def _space_width(self, font: ImageFont.FreeTypeFont) -> float:
+        if font not in self._space_widths:
+            self._space_widths[font] = font.getlength(' ')
+        return self._space_widths[font]
+    
+    def measure(self, text: str, font: ImageFont.FreeTypeFont) -> Tuple[int, int]:
+        """Exact textbbox width and height of a single line, memoized per font"""
+        key = (text, font)
+        size = self._sizes.get(key)
+        if size is None:
+            bbox = self._temp_draw.textbbox((0, 0), text, font=font)
+            size = (bbox[2] - bbox[0], bbox[3] - bbox[1])
+            self._sizes[key] = size
+            if len(self._sizes) > TEXT_LAYOUT_CACHE_SIZE:
+                self._sizes.clear()
+        return size
+
+    def group_runs(self, tokens: List[str], font: ImageFont.FreeTypeFont) -> Tuple[List[Tuple[int, str]], int]:
+        """
+        Join consecutive tokens into strings that draw exactly like placing each token at the
+        sum of the previous tokens' textbbox widths. Returns (x offset, text) runs and the total width.
+        """
+        runs = []
+        x = 0
+        for i, token in enumerate(tokens):
+            if i and self._joins(tokens[i - 1], token, font):
+                runs[-1][1].append(token)
+            else:
+                runs.append((x, [token]))
+            left, _, right, _ = self._word_metrics(token, font)[1]
+            x += right - left
+        return [(offset, ''.join(run)) for offset, run in runs], x
+
+    def _joins(self, previous: str, token: str, font: ImageFont.FreeTypeFont) -> bool:
+        """
+        Whether token can be drawn in the same call as previous: the pen must land exactly on
+        previous's box edge (no fractional advance, kerning or overhang) and the ink must not overlap.
+        """
+        advance, (left, _, right, _) = self._word_metrics(previous, font)
+        next_left = self._word_metrics(token, font)[1][0]
+        return left == 0 and next_left >= 0 and advance + self._kerning(previous[-1], token[0], font) == right
+
+    def _kerning(self, first: str, second: str, font: ImageFont.FreeTypeFont) -> float:
+        key = (first, second, font)
+        if key not in self._kerning_pairs:
+            self._kerning_pairs[key] = font.getlength(first + second) - font.getlength(first) - font.getlength(second)
+        return self._kerning_pairs[key]
+
     def get_text_dimensions(self, text: str, font_type: str) -> Tuple[int, int]:
         """Get width and height of text"""
-        font = self.get_font(font_type)
-        bbox = self._temp_draw.textbbox((0, 0), text, font=font)
-        return bbox[2] - bbox[0], bbox[3] - bbox[1]
+        if '\n' in text:
+            # Multiline bounding boxes include the line spacing, so measure them as a whole
+            bbox = self._temp_draw.textbbox((0, 0), text, font=self.get_font(font_type))
+            return bbox[2] - bbox[0], bbox[3] - bbox[1]
+        return self.measure(text, self.get_font(font_type))
     
     def get_multiline_dimensions(self, lines: List[str], font_type: str, line_spacing: float) -> Tuple[int, int]:
         """Get dimensions of multiline text"""
-        font = self.get_font(font_type)
-        
+        return self.get_lines_dimensions(lines, self.get_font(font_type), line_spacing)
+    
+    def get_lines_dimensions(self, lines: List[str], font: ImageFont.FreeTypeFont, line_spacing: float) -> Tuple[int, int]:
+        """Get dimensions of wrapped lines in a specific font"""
         # Calculate text width (max line width)
-        text_width = 0
-        for line in lines:
-            bbox = self._temp_draw.textbbox((0, 0), line, font=font)
-            text_width = max(text_width, bbox[2] - bbox[0])
+        text_width = max((self.measure(line, font)[0] for line in lines), default=0)
         
         # Calculate text height
         line_height = font.size * line_spacing
         text_height = len(lines) * line_height
         
-        return text_width, text_height
\ No newline at end of file
+        return text_width, text_height
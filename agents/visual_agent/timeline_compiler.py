@@ -0,0 +1,160 @@
+import numpy as np
+from typing import Dict, Iterator, List, Optional, Tuple
+from .constants import *
+from .transitions import TransitionEngine
+
+class TimelineCompiler:
+    """Compiles slide timings, transitions and overlays into constant visual intervals"""
+
+    def __init__(self, fps: int = FPS, video_size: Tuple[int, int] = VIDEO_SIZE,
+                 transition: str = TRANSITION_MODE):
+        self.fps = fps
+        self.transition_engine = TransitionEngine(video_size, fps, transition)
+
+    def compile(self, timings: List[Dict], total_duration: float,
+                overlays: Optional[List[Dict]] = None) -> List[Dict]:
+        """
+        Map the output frame grid onto an ordered list of constant visual intervals.
+        Timing follows compose_video and CompositeVideoClip: a layer is visible for
+        start <= t < start + duration, and each transition step is its own one-frame interval.
+        """
+        overlays = overlays or []
+        durations = [timing['duration'] for timing in timings]
+        starts = np.cumsum([0] + durations)
+        # Same frame grid as MoviePy's iter_frames
+        times = np.arange(0, total_duration, 1.0 / self.fps)
+        slide_indices = np.searchsorted(starts, times, side='right') - 1
+
+        # Visibility of every overlay on the frame grid, in stacking order
+        overlay_visible = [
+            (times >= overlay['start']) & (times < overlay['start'] + overlay['duration'])
+            for overlay in overlays
+        ]
+
+        intervals = []
+        last_state = None
+
+        for frame_idx, (t, slide_idx) in enumerate(zip(times, slide_indices)):
+            slide, transition = None, None
+            if slide_idx < len(timings):
+                slide = int(slide_idx)
+                local_t = t - starts[slide_idx]
+                if 0 < slide < len(timings) - 1 and local_t < self.transition_engine.duration:
+                    transition = 1.0 * local_t / self.transition_engine.duration
+
+            active = tuple(i for i, visible in enumerate(overlay_visible) if visible[frame_idx])
+            state = (slide, transition, active)
+
+            if state == last_state:
+                intervals[-1]['frame_count'] += 1
+                continue
+
+            intervals.append({
+                'start_frame': frame_idx,
+                'frame_count': 1,
+                'slide': slide,
+                'transition': transition,
+                'overlays': active,
+            })
+            last_state = state
+
+        return intervals
+
+    def slide_start_frames(self, timings: List[Dict], total_duration: float) -> List[int]:
+        """First output frame of every slide after the first, on the same frame grid as compile"""
+        starts = np.cumsum([0] + [timing['duration'] for timing in timings])[1:-1]
+        times = np.arange(0, total_duration, 1.0 / self.fps)
+        frames = np.searchsorted(times, starts, side='left')
+        return [int(frame) for frame in frames if frame < len(times)]
+
+    @staticmethod
+    def slide_boundaries(intervals: List[Dict]) -> List[int]:
+        """Indices of intervals where a new slide starts, the safe points to split an encode"""
+        return [
+            i for i in range(1, len(intervals))
+            if intervals[i]['slide'] != intervals[i - 1]['slide']
+        ]
+
+    def render_segments(self, intervals: List[Dict], slide_frames: List[np.ndarray],
+                        overlay_layers: Optional[List[Dict]] = None) -> Iterator[Tuple[tuple, np.ndarray, int]]:
+        """
+        Yield (state_key, frame, frame_count) per interval, compositing each distinct state once.
+        Transition frames come from a reused buffer, so each frame must be consumed before
+        the next one is requested.
+        """
+        overlay_layers = overlay_layers or []
+        still_frames = {}
+        i = 0
+
+        while i < len(intervals):
+            interval = intervals[i]
+
+            if interval['transition'] is None:
+                key = (interval['slide'], None, interval['overlays'])
+                if key not in still_frames:
+                    still_frames[key] = self._composite_still(interval, slide_frames, overlay_layers)
+                yield key, still_frames[key], interval['frame_count']
+                i += 1
+                continue
+
+            # Blend the whole run of transition steps into this slide in one batch
+            run_end = i
+            while (run_end < len(intervals) and intervals[run_end]['transition'] is not None
+                   and intervals[run_end]['slide'] == interval['slide']):
+                run_end += 1
+            run = intervals[i:run_end]
+
+            slide = interval['slide']
+            frames = self.transition_engine.render(
+                slide_frames[slide - 1], slide_frames[slide], [step['transition'] for step in run]
+            )
+            for step, frame in zip(run, frames):
+                for overlay_idx in step['overlays']:
+                    self._blit(frame, overlay_layers[overlay_idx])
+                yield (slide, step['transition'], step['overlays']), frame, step['frame_count']
+            i = run_end
+
+        print(f"🧮 Compiled {len(intervals)} intervals from {len(still_frames)} distinct still frames")
+
+    def _composite_still(self, interval: Dict, slide_frames: List[np.ndarray],
+                         overlay_layers: List[Dict]) -> np.ndarray:
+        """Build one held frame: slide (or black), then every active overlay in one pass"""
+        if interval['slide'] is None:
+            frame = np.zeros_like(slide_frames[0])
+        else:
+            frame = slide_frames[interval['slide']]
+
+        if interval['overlays']:
+            frame = frame.copy()
+            for overlay_idx in interval['overlays']:
+                self._blit(frame, overlay_layers[overlay_idx])
+
+        return frame
+
+    @staticmethod
+    def _blit(frame: np.ndarray, layer: Dict):
+        """Blit an overlay in place, matching MoviePy's positioning and mask blending"""
+        rgb, mask = layer['rgb'], layer['mask']
+        frame_h, frame_w = frame.shape[:2]
+        layer_h, layer_w = rgb.shape[:2]
+
+        x, y = layer['position']
+        if isinstance(x, str):
+            x = {'left': 0, 'center': (frame_w - layer_w) / 2, 'right': frame_w - layer_w}[x]
+        if isinstance(y, str):
+            y = {'top': 0, 'center': (frame_h - layer_h) / 2, 'bottom': frame_h - layer_h}[y]
+        x, y = int(x), int(y)
+
+        # Clip the layer to the frame
+        x1, y1 = max(0, -x), max(0, -y)
+        x2, y2 = min(layer_w, frame_w - x), min(layer_h, frame_h - y)
+        if x1 >= x2 or y1 >= y2:
+            return
+
+        region = frame[y + y1:y + y2, x + x1:x + x2]
+        blitted = rgb[y1:y2, x1:x2]
+        if mask is None:
+            region[...] = blitted
+        else:
+            alpha = mask[y1:y2, x1:x2, np.newaxis]
+            region[...] = (1.0 * alpha * blitted + (1.0 - alpha) * region).astype('uint8')
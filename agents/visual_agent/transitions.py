@@ -0,0 +1,52 @@
+import numpy as np
+from typing import Sequence, Tuple
+from .constants import *
+
+class TransitionEngine:
+    """
+    Precomputes the few transition frames between two slide images as one batched uint8 blend.
+    'fade' fades the incoming slide in from black (MoviePy's fadein); 'crossfade' blends
+    from the previous slide. Frames are written into a buffer that is reused between calls.
+    """
+
+    def __init__(self, video_size: Tuple[int, int], fps: int = FPS, mode: str = TRANSITION_MODE):
+        if mode not in ('fade', 'crossfade'):
+            raise ValueError(f"Unknown transition mode: {mode}")
+        self.width, self.height = video_size
+        self.fps = fps
+        self.mode = mode
+        self.duration = CROSSFADE_DURATION if mode == 'crossfade' else FADE_DURATION
+
+        max_frames = int(np.ceil(self.duration * fps)) + 1
+        self._buffer = np.empty((max_frames, self.height, self.width, 3), dtype=np.uint8)
+        self._pairs = np.empty((self.height, self.width, 3), dtype=np.uint16)
+        self._levels = np.arange(256, dtype=np.float64)
+
+    def render(self, prev_frame: np.ndarray, next_frame: np.ndarray,
+               factors: Sequence[float]) -> np.ndarray:
+        """
+        Blend prev_frame into next_frame at each factor in [0, 1).
+        Returns a view of the reused buffer, valid until the next call.
+        """
+        if self.mode == 'fade':
+            prev_frame = None
+
+        # Pack each (prev, next) pixel pair into one 16-bit index, once per transition
+        np.copyto(self._pairs, next_frame)
+        if prev_frame is not None:
+            self._pairs += prev_frame.astype(np.uint16) << 8
+
+        frames = self._buffer[:len(factors)]
+        for frame, lut in zip(frames, self._blend_tables(factors)):
+            np.take(lut, self._pairs, out=frame)
+        return frames
+
+    def _blend_tables(self, factors: Sequence[float]) -> np.ndarray:
+        """
+        256x256 lookup table per factor, flattened as [prev << 8 | next].
+        Values use the same float arithmetic as MoviePy's fades, truncated to uint8.
+        """
+        factors = np.asarray(factors, dtype=np.float64)[:, np.newaxis, np.newaxis]
+        incoming = factors * self._levels[np.newaxis, np.newaxis, :]
+        outgoing = (1 - factors) * self._levels[np.newaxis, :, np.newaxis]
+        return (incoming + outgoing).astype(np.uint8).reshape(len(factors), -1)
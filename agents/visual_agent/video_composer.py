@@ -1,12 +1,16 @@
 from moviepy.editor import *
 from typing import List, Dict
 from .constants import *
+from .encoding import EncodingSettings
 
 class VideoComposer:
     """Handles video composition and timing calculations"""
     
-    def __init__(self, fps: int = FPS):
+    def __init__(self, fps: int = FPS, transition: str = TRANSITION_MODE,
+                 encoding: EncodingSettings = None):
         self.fps = fps
+        self.transition = transition
+        self.encoding = encoding or EncodingSettings(fps)
     
     def compose_video(self, rendered_clips: List, audio_clip, output_path: str):
         """Compose final video from clips and audio"""
@@ -16,7 +20,10 @@ class VideoComposer:
         clips_with_transitions = []
         for i, clip in enumerate(rendered_clips):
             if i > 0 and i < len(rendered_clips) - 1:
-                clip = clip.fadein(FADE_DURATION)
+                if self.transition == 'crossfade':
+                    clip = self._crossfade_from(rendered_clips[i - 1], clip)
+                else:
+                    clip = clip.fadein(FADE_DURATION)
             clips_with_transitions.append(clip)
         
         # Concatenate clips
@@ -25,6 +32,37 @@ class VideoComposer:
         final_video = final_video.set_audio(audio_clip)
         
         return final_video
+
+    def _crossfade_from(self, prev_clip, clip):
+        """Blend in from the previous slide, with the same arithmetic as the TransitionEngine"""
+        prev_frame = prev_clip.get_frame(0)
+
+        def blend(gf, t):
+            if t >= CROSSFADE_DURATION:
+                return gf(t)
+            fading = 1.0 * t / CROSSFADE_DURATION
+            return fading * gf(t) + (1 - fading) * prev_frame
+
+        return clip.fl(blend)
+
+    def write_video(self, final_video, output_path: str, keyframes: List[int] = ()):
+        """Encode a composed MoviePy clip with the shared codec settings"""
+        # MoviePy passes the bitrate itself; CRF and tuning go through ffmpeg_params
+        ffmpeg_params = self.encoding.tuning_args(keyframes)
+        if self.encoding.video_bitrate is None:
+            ffmpeg_params = self.encoding.rate_args() + ffmpeg_params
+
+        final_video.write_videofile(
+            output_path,
+            fps=self.fps,
+            codec=VIDEO_CODEC,
+            audio_codec=AUDIO_CODEC,
+            audio_fps=AUDIO_FPS,
+            preset=self.encoding.preset,
+            threads=VIDEO_THREADS,
+            bitrate=self.encoding.video_bitrate,
+            ffmpeg_params=ffmpeg_params
+        )
     
     def calculate_slide_timings_from_voice(self, slides: List[Dict], timing_data: List[Dict], 
                                           total_duration: float) -> List[Dict]:
@@ -1,34 +1,59 @@
 from moviepy.editor import AudioFileClip, ImageClip
 import numpy as np
 import os
+import threading
 import traceback
 
 # Import modular components
-from .constants import VIDEO_SIZE, FPS
+from .constants import (ENCODER_MODE, ENCODE_WORKERS, ENCODE_TUNING, RENDER_WORKERS, RENDER_PROFILE,
+                        TRANSITION_MODE)
+from .render_profile import RenderProfile
 from .avatar_manager import AvatarManager
 from .text_utils import TextManager
 from .script_parser import ScriptParser
 from .slide_renderer import SlideRenderer
+from .slide_cache import SlideCache
+from .slide_pool import SlideRenderPool
 from .video_composer import VideoComposer
+from .still_frame_encoder import StillFrameEncoder
+from .timeline_compiler import TimelineCompiler
+from .encoding import EncodingSettings
 from .moviepy_overlay_manager import MoviePyOverlayManager
 
 class VisualAgent():
     """Main Visual Agent for educational video generation"""
     
-    def __init__(self):
-        self.output_dir = "output"
+    def __init__(self, encoder: str = ENCODER_MODE, encode_workers: int = ENCODE_WORKERS,
+                 render_workers: int = RENDER_WORKERS, transition: str = TRANSITION_MODE,
+                 profile: str = RENDER_PROFILE, tuning: str = ENCODE_TUNING, output_dir: str = "output"):
+        self.output_dir = output_dir
         os.makedirs(self.output_dir, exist_ok=True)
+        self.encoder = encoder
+        self.profile = RenderProfile(profile)
+        video_size, fps = self.profile.video_size, self.profile.fps
         
         # Initialize components
         self.avatar_manager = AvatarManager()
-        self.text_manager = TextManager()
-        self.slide_renderer = SlideRenderer(VIDEO_SIZE, self.avatar_manager, self.text_manager)
-        self.video_composer = VideoComposer(FPS)
+        self.text_manager = TextManager(self.profile.font_sizes)
+        self.slide_renderer = SlideRenderer(video_size, self.avatar_manager, self.text_manager, self.profile)
+        self.slide_cache = SlideCache(self.avatar_manager, self.text_manager, self.profile)
+        render_workers = render_workers or os.cpu_count() or 1
+        self.render_pool = SlideRenderPool(render_workers, profile) if render_workers > 1 else None
+        self.encoding = EncodingSettings(fps, self.profile.preset, self.profile.bitrate, self.profile.crf, tuning)
+        self.video_composer = VideoComposer(fps, transition, self.encoding)
+        self.still_encoder = StillFrameEncoder(fps, encode_workers, self.encoding)
+        self.timeline_compiler = TimelineCompiler(fps, video_size, transition)
         self.script_parser = ScriptParser()
-        self.overlay_manager = MoviePyOverlayManager(VIDEO_SIZE)
+        self.overlay_manager = MoviePyOverlayManager(video_size, self.text_manager, self.profile)
+        # run() and prepare() share the renderers and their caches, so only one runs at a time
+        self._lock = threading.Lock()
     
     def run(self, input_data, **kwargs):
         """Generate educational video with large avatars"""
+        with self._lock:
+            return self._generate_video(input_data, **kwargs)
+    
+    def _generate_video(self, input_data, **kwargs):
         try:
             # Extract input data
             character = input_data["character"]
@@ -40,6 +65,9 @@ class VisualAgent():
 
             print(f"\n🎬 Creating educational video for: {lesson_title}")
             print(f"🎨 Using avatars for {character['name']}")
+            if not self.profile.is_production:
+                width, height = self.profile.video_size
+                print(f"📐 Render profile '{self.profile.name}': {width}x{height} @ {self.profile.fps} fps")
 
             # Load and prepare audio
             audio_clip = self._load_audio(voice_path)
@@ -54,25 +82,48 @@ class VisualAgent():
             timings = self._calculate_timings(slides, timing_data, total_duration)
 
             # Render slides
-            rendered_clips = self._render_slides(slides, timings, character, lesson_title, overlay_data)
+            slide_frames = self._render_slides(slides, character, lesson_title, overlay_data)
 
             # Compose final video
-            output_filename = f"{character['name']}_{lesson_title.replace(' ', '_')}.mp4"
+            # Previews get their own file so they never overwrite a production render
+            suffix = "" if self.profile.is_production else f"_{self.profile.name}"
+            output_filename = f"{character['name']}_{lesson_title.replace(' ', '_')}{suffix}.mp4"
             output_path = os.path.join(self.output_dir, output_filename)
-            
+
+            has_overlays = bool(overlay_data and timing_data and
+                                (overlay_data.get('caption_phrases') or overlay_data.get('emphasis_points')))
+
+            # Fast path: compile one timeline and hold each distinct frame with ffmpeg
+            if self.encoder == 'still':
+                overlays = self.overlay_manager.plan_overlays(timing_data, overlay_data) if has_overlays else []
+                overlay_layers = [self.overlay_manager.get_overlay_layer(overlay) for overlay in overlays]
+                intervals = self.timeline_compiler.compile(timings, total_duration, overlays)
+                segments = self.timeline_compiler.render_segments(intervals, slide_frames, overlay_layers)
+                boundaries = self.timeline_compiler.slide_boundaries(intervals)
+                self.still_encoder.encode(segments, voice_path, output_path, boundaries)
+                print(f"✅ Video saved: {output_path}")
+                self._cleanup(audio_clip)
+                return output_path
+
+            rendered_clips = [
+                ImageClip(frame).set_duration(timing['duration'])
+                for frame, timing in zip(slide_frames, timings)
+            ]
             final_video = self.video_composer.compose_video(
                 rendered_clips, audio_clip, output_path
             )
+            keyframes = self.timeline_compiler.slide_start_frames(timings, total_duration)
 
             # MoviePy CompositeVideoClip with overlays on top of the composed video for dynamic overlays
-            if overlay_data and timing_data:
+            if has_overlays:
                 final_video_with_overlays = self.overlay_manager.apply_all_overlays(final_video, timing_data, overlay_data)
                 print(f"💡 Applying overlays...")
-                final_video_with_overlays.write_videofile(output_path, fps=FPS, audio=True)
+                self.video_composer.write_video(final_video_with_overlays, output_path, keyframes)
 
                 final_video_with_overlays.close()
                 print(f"✅ Video with overlays saved at: {output_path}")
             else:
+                self.video_composer.write_video(final_video, output_path, keyframes)
                 print(f"✅ Video saved without overlays: {output_path}")
 
             # Cleanup
@@ -84,6 +135,35 @@ class VisualAgent():
             traceback.print_exc()
             raise
     
+    def prepare(self, input_data):
+        """
+        Render a lesson's slides and overlay sprites before its audio exists. Both depend only on
+        the script, so run() later finds them in the slide and sprite caches and only the real
+        durations are applied.
+        """
+        with self._lock:
+            character = input_data["character"]
+            lesson_title = input_data["lesson_title"]
+            overlay_data = input_data.get("overlay_data", {})
+            
+            print(f"\n🧑‍🎨 Preparing slides for: {lesson_title}")
+            slides = self.script_parser.parse_script_to_slides(input_data["script"], character['name'])
+            self._render_slides(slides, character, lesson_title, overlay_data)
+            
+            if self.encoder == 'still' and overlay_data:
+                # Which overlays fire depends on the segment texts and their order, not on their times
+                segments = [
+                    {'speaker': slide['speaker_name'] or slide['type'], 'text': slide['text'],
+                     'start_time': 0.0, 'duration': 0.0}
+                    for slide in slides if slide['type'] != 'title'
+                ]
+                for overlay in self.overlay_manager.plan_overlays(segments, overlay_data):
+                    self.overlay_manager.get_overlay_layer(overlay)
+            
+            self.avatar_manager.clear_cache()
+            self.slide_renderer.clear_cache()
+            return len(slides)
+    
     def _load_audio(self, voice_path: str) -> AudioFileClip:
         """Load and prepare audio clip"""
         full_audio = AudioFileClip(voice_path)
@@ -100,43 +180,57 @@ class VisualAgent():
             print("⚠️ No timing data provided, estimating from text length")
             return self.video_composer.calculate_slide_timings(slides, total_duration)
     
-    def _render_slides(self, slides: list, timings: list, character: dict, 
+    def _render_slides(self, slides: list, character: dict,
                       lesson_title: str, overlay_data: dict = None) -> list:
-        """Pre-render all slides"""
+        """Pre-render all slides to RGB frames"""
         print("🎨 Pre-rendering all slides with large avatars...")
-        rendered_clips = []
+        overlay_data = overlay_data or {}
+        highlight_words = overlay_data.get("highlight_keywords", [])
+        slide_frames = []
+        misses = []
+        self.slide_cache.reset_stats()
         
-        for i, (slide, timing) in enumerate(zip(slides, timings)):
-            print(f"  Rendering slide {i+1}/{len(slides)}: {slide['type']}")
-            
-            # Render appropriate slide type
-            if slide['type'] == 'title':
-                pil_image = self.slide_renderer.render_title_slide(lesson_title, character)
-            elif slide['type'] == 'end':
-                pil_image = self.slide_renderer.render_end_slide(lesson_title)
-            else:
-                pil_image = self.slide_renderer.render_content_slide(
-                    text=slide['text'],
-                    speaker_type=slide['type'],
-                    speaker_name=slide.get('speaker_name', ''),
-                    character=character,
-                    lesson_title=lesson_title,
-                    slide_number=i,
-                    total_slides=len(slides),
-                    highlight_words=overlay_data.get("highlight_keywords", [])
+        for i, slide in enumerate(slides):
+            # Unchanged slides are reused from earlier runs
+            cache_key = self.slide_cache.make_key(slide, i, len(slides), character,
+                                                  lesson_title, highlight_words)
+            slide_frames.append(self.slide_cache.get(cache_key))
+            if slide_frames[-1] is None:
+                misses.append((i, cache_key))
+        
+        if self.render_pool is not None and len(misses) > 1:
+            print(f"🧵 Rendering {len(misses)} slides across {self.render_pool.workers} worker processes...")
+            jobs = [(slides[i], i) for i, _ in misses]
+            rendered = self.render_pool.render(jobs, len(slides), character, lesson_title, highlight_words)
+        else:
+            rendered = []
+            for i, _ in misses:
+                print(f"  Rendering slide {i+1}/{len(slides)}: {slides[i]['type']}")
+                pil_image = self.slide_renderer.render_slide(
+                    slides[i], i, len(slides), character, lesson_title, highlight_words
                 )
-            
-            # Convert PIL to MoviePy ImageClip
-            img_array = np.array(pil_image)
-            clip = ImageClip(img_array).set_duration(timing['duration'])
-            rendered_clips.append(clip)
+                rendered.append(np.array(pil_image))
         
-        return rendered_clips
+        for (i, cache_key), frame in zip(misses, rendered):
+            self.slide_cache.put(cache_key, frame)
+            slide_frames[i] = frame
+        
+        stats = self.slide_cache.stats()
+        print(f"🗃️ Slide cache: {stats['hits']} reused, {stats['misses']} rendered "
+              f"(lifetime hit rate {stats['cache']['hit_rate']:.0%})")
+        return slide_frames
     
-    def _cleanup(self, audio_clip, video_clip):
+    def _cleanup(self, audio_clip, video_clip=None):
         """Clean up resources"""
         audio_clip.close()
-        video_clip.close()
+        if video_clip is not None:
+            video_clip.close()
         self.avatar_manager.clear_cache()
-        self.overlay_manager.clear_cache() 
+        self.slide_renderer.clear_cache()
+        self.overlay_manager.clear_cache()
+    
+    def close(self):
+        """Shut down the slide rendering processes, if any"""
+        if self.render_pool is not None:
+            self.render_pool.close()
 
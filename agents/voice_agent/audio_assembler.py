@@ -0,0 +1,82 @@
+import numpy as np
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from .constants import (
+    TITLE_SILENCE_MS, SEGMENT_PADDING_MS, END_SILENCE_MS,
+    TTS_SAMPLE_RATE, TTS_SAMPLE_WIDTH, TTS_CHANNELS
+)
+
+class AudioAssembler:
+    """Builds a lesson's audio in one preallocated int16 buffer instead of repeated concatenation"""
+    
+    def __init__(self, sample_rate: int = TTS_SAMPLE_RATE, channels: int = TTS_CHANNELS):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.frame_bytes = TTS_SAMPLE_WIDTH * channels
+    
+    def samples(self, duration_ms: int) -> int:
+        """Number of sample frames in a duration"""
+        return int(self.sample_rate * duration_ms / 1000)
+    
+    def duration(self, pcm: bytes) -> float:
+        """Duration of a PCM segment in seconds, from its sample count"""
+        return len(pcm) // self.frame_bytes / self.sample_rate
+    
+    def assemble(self, segments: List[Tuple[Dict, bytes]], end_slide: Dict) -> Tuple[np.ndarray, List[Dict]]:
+        """
+        Lay out title silence, each segment followed by SEGMENT_PADDING_MS and the end slide
+        silence, then copy every segment's PCM into its place in one zeroed buffer. Returns the
+        buffer and the timing table, both derived from the same sample offsets.
+        """
+        # Layout pass: (timing entry, pcm, first frame, frame count)
+        padding = self.samples(SEGMENT_PADDING_MS)
+        position = self.samples(TITLE_SILENCE_MS)
+        layout: List[Tuple[Dict, Optional[bytes], int, int]] = []
+        for entry, pcm in segments:
+            count = len(pcm) // self.frame_bytes
+            layout.append((entry, pcm, position, count))
+            position += count + padding
+        layout.append((end_slide, None, position, self.samples(END_SILENCE_MS)))
+        total = position + layout[-1][3]
+        
+        # Fill pass: silence is the zeroed buffer itself
+        buffer = np.zeros(total * self.channels, dtype='<i2')
+        timing_data = []
+        for entry, pcm, start, count in layout:
+            if pcm:
+                buffer[start * self.channels:(start + count) * self.channels] = np.frombuffer(
+                    pcm, dtype='<i2', count=count * self.channels
+                )
+            timing_data.append(self._timing_entry(entry, start, count))
+        
+        return buffer, timing_data
+    
+    def stream(self, segments: Iterable[Tuple[Dict, bytes]], end_slide: Dict,
+               write: Callable[[bytes], None]) -> List[Dict]:
+        """
+        Same layout as assemble, written out in order as segments arrive instead of filled into
+        one buffer: only the segment being written is held. Returns the timing table.
+        """
+        padding = bytes(self.samples(SEGMENT_PADDING_MS) * self.frame_bytes)
+        position = self.samples(TITLE_SILENCE_MS)
+        write(bytes(position * self.frame_bytes))
+        
+        timing_data = []
+        for entry, pcm in segments:
+            count = len(pcm) // self.frame_bytes
+            write(memoryview(pcm)[:count * self.frame_bytes])
+            write(padding)
+            timing_data.append(self._timing_entry(entry, position, count))
+            position += count + len(padding) // self.frame_bytes
+        
+        end_count = self.samples(END_SILENCE_MS)
+        write(bytes(end_count * self.frame_bytes))
+        timing_data.append(self._timing_entry(end_slide, position, end_count))
+        return timing_data
+    
+    def _timing_entry(self, entry: Dict, start: int, count: int) -> Dict:
+        return {
+            **entry,
+            "start_time": start / self.sample_rate,
+            "duration": count / self.sample_rate,
+            "end_time": (start + count) / self.sample_rate
+        }
@@ -0,0 +1,63 @@
+import subprocess
+import numpy as np
+from typing import Callable, List, TypeVar
+from moviepy.config import get_setting
+from .constants import TTS_SAMPLE_RATE, TTS_CHANNELS, TTS_MP3_BITRATE
+
+T = TypeVar('T')
+
+class AudioEncoder:
+    """Encodes int16 PCM sample buffers to the lesson MP3 with ffmpeg"""
+    
+    def __init__(self, sample_rate: int = TTS_SAMPLE_RATE, channels: int = TTS_CHANNELS):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.ffmpeg_binary = get_setting("FFMPEG_BINARY")
+    
+    def encode(self, samples: np.ndarray, output_path: str):
+        """Pipe the buffer to ffmpeg as raw PCM; the array's memory is written as-is, without a copy"""
+        process = self._start(output_path)
+        _, error = process.communicate(memoryview(np.ascontiguousarray(samples)).cast('B'))
+        self._check(process, error)
+    
+    def encode_stream(self, output_path: str, produce: Callable[[Callable[[bytes], None]], T]) -> T:
+        """
+        Keep one ffmpeg process open while produce(write) feeds it PCM chunks in order, so
+        encoding overlaps synthesis and the file is done moments after the last chunk.
+        Returns what produce returns.
+        """
+        process = self._start(output_path)
+        try:
+            result = produce(process.stdin.write)
+        except BrokenPipeError:
+            # ffmpeg exited early; its own error explains why
+            _, error = process.communicate()
+            self._check(process, error)
+            raise
+        except BaseException:
+            process.kill()
+            process.wait()
+            raise
+        _, error = process.communicate()
+        self._check(process, error)
+        return result
+    
+    def _start(self, output_path: str) -> subprocess.Popen:
+        # stderr goes to a pipe read only at the end; -loglevel error keeps it far below the pipe buffer
+        return subprocess.Popen(
+            self._command(output_path),
+            stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+        )
+    
+    @staticmethod
+    def _check(process: subprocess.Popen, error: bytes):
+        if process.returncode != 0:
+            raise IOError(f"ffmpeg audio encoding failed:\n{error.decode('utf8', errors='ignore')}")
+    
+    def _command(self, output_path: str) -> List[str]:
+        return [
+            self.ffmpeg_binary, '-y', '-loglevel', 'error',
+            '-f', 's16le', '-ar', str(self.sample_rate), '-ac', str(self.channels), '-i', 'pipe:0',
+            '-acodec', 'libmp3lame', '-b:a', TTS_MP3_BITRATE,
+            output_path
+        ]
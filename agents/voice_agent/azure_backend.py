@@ -0,0 +1,54 @@
+import azure.cognitiveservices.speech as speechsdk
+import os
+from dotenv import load_dotenv
+from typing import Dict, Optional, Tuple
+from .constants import TTS_OUTPUT_FORMAT
+from .synthesis_backend import SynthesisBackend
+
+load_dotenv()
+
+class AzureSynthesisBackend(SynthesisBackend):
+    """Azure Speech synthesis into in-memory PCM"""
+    
+    name = 'azure'
+    
+    def __init__(self):
+        # Azure TTS configuration
+        self.speech_key = os.getenv("AZURE_OPENAI_TTS_KEY")
+        self.speech_region = os.getenv("AZURE_OPENAI_TTS_REGION")
+        self.speech_config = speechsdk.SpeechConfig(
+            subscription=self.speech_key,
+            region=self.speech_region
+        )
+        # Segments come back as raw PCM, so nothing is encoded until the final lesson file
+        self.speech_config.set_speech_synthesis_output_format(
+            getattr(speechsdk.SpeechSynthesisOutputFormat, TTS_OUTPUT_FORMAT)
+        )
+    
+    def synthesize(self, ssml: str) -> Optional[Tuple[bytes, Dict[str, float]]]:
+        # No audio config: the audio stays in the result instead of going to a file or speaker
+        synthesizer = speechsdk.SpeechSynthesizer(
+            speech_config=self.speech_config,
+            audio_config=None
+        )
+        marks = {}
+        # Offsets arrive in 100-nanosecond ticks
+        synthesizer.bookmark_reached.connect(
+            lambda evt: marks.__setitem__(evt.text, evt.audio_offset / 10_000_000)
+        )
+        
+        # Use SSML synthesis
+        result = synthesizer.speak_ssml_async(ssml).get()
+        
+        if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
+            return result.audio_data, marks
+
+        elif result.reason == speechsdk.ResultReason.Canceled:
+            cancellation_details = result.cancellation_details
+            print(f"❌ Speech synthesis canceled: {cancellation_details.reason}")
+            if cancellation_details.reason == speechsdk.CancellationReason.Error:
+                print(f"❌ Error details: {cancellation_details.error_details}")
+            return None
+        else:
+            print(f"❌ Speech synthesis failed: {result.reason}")
+            return None
@@ -1,9 +1,41 @@
+import os
+
 # Timing constants
 TITLE_SILENCE_MS = 3000  # 3 seconds for title slide
 SEGMENT_PADDING_MS = 700  # 0.7 seconds between segments
 END_SILENCE_MS = 2500    # 2.5 seconds for end slide
 DEFAULT_SEGMENT_DURATION = 3.0  # Default duration when audio fails
 
+# Synthesis settings
+TTS_MAX_CONCURRENCY = 4  # Segment synthesis requests in flight at once; 1 synthesizes sequentially
+# 'segment' sends one request per script line; 'batched' packs consecutive lines into one SSML
+# document per request and cuts the audio apart at <bookmark> offsets
+TTS_SYNTHESIS_MODE = 'segment'
+TTS_BATCH_MAX_SEGMENTS = 10  # Lines per batched request
+TTS_BATCH_MAX_CHARS = 4000   # Text characters per batched request
+# Long lines can be split at sentence boundaries into pieces synthesized in parallel and joined
+# back without a gap ('segment' mode only); the line still gets a single timing entry
+TTS_SPLIT_SENTENCES = False
+TTS_SPLIT_MIN_WORDS = 25       # Lines shorter than this are sent whole
+TTS_SPLIT_MIN_PIECE_WORDS = 6  # Shorter sentences are merged into the next piece
+
+# Segment audio format: raw PCM kept in memory and encoded to MP3 once per lesson
+TTS_OUTPUT_FORMAT = "Raw24Khz16BitMonoPcm"  # speechsdk.SpeechSynthesisOutputFormat member
+TTS_SAMPLE_RATE = 24000
+TTS_SAMPLE_WIDTH = 2  # Bytes per sample (16-bit)
+TTS_CHANNELS = 1
+TTS_MP3_BITRATE = "128k"
+TTS_STREAM_ENCODING = True  # Feed segments to one long-lived encoder as they finish instead of encoding at the end
+
+# Duration prediction from text, fitted on earlier runs' timing files (benchmark_video_gen.py predictor)
+TTS_TIMING_HISTORY = "output/*_timing.json"
+DURATION_PRIOR_SEGMENTS = 3  # Pseudo-segments pulling sparse voice/style groups toward their parent
+
+# Segment cache: synthesized PCM keyed by the exact SSML, reused across lessons and runs
+TTS_CACHE_DIR = "cache/tts"
+TTS_CACHE_MAX_BYTES = 512 * 1024 * 1024
+TTS_CACHE_MEMORY_BYTES = 32 * 1024 * 1024
+
 # Emotion to SSML style mapping
 EMOTION_TO_STYLE = {
     # Positive emotions
@@ -112,4 +144,27 @@ VOICE_SUPPORTED_STYLES = {
 # Voice selection
 NARRATOR_VOICE = "en-US-JennyNeural"
 MALE_CHARACTER_VOICE = "en-US-GuyNeural"
-FEMALE_CHARACTER_VOICE = "en-US-AriaNeural"
\ No newline at end of file
+FEMALE_CHARACTER_VOICE = "en-US-AriaNeural"
+
+# Synthesis backend: 'azure' (Azure Speech) or 'offline' (deterministic local stand-in, no credentials).
+# Read from the environment so hosts without Azure credentials can run the pipeline with TTS_BACKEND=offline
+TTS_BACKEND = os.getenv("TTS_BACKEND", "azure")
+
+# Offline engine model: speaking rate, punctuation pauses and silence around each request,
+# roughly calibrated on the sample lesson's Azure timings
+OFFLINE_TTS_WORDS_PER_SECOND = 2.9
+OFFLINE_TTS_PAUSES = {'.': 0.45, '!': 0.45, '?': 0.45, ',': 0.25, ';': 0.25, ':': 0.25}
+OFFLINE_TTS_EDGE_SILENCE = 0.3  # Seconds of lead-in and tail per request
+OFFLINE_TTS_VOICE_RATES = {
+    NARRATOR_VOICE: 0.85,
+    MALE_CHARACTER_VOICE: 1.0,
+    FEMALE_CHARACTER_VOICE: 1.0,
+}
+# Relative speed per style; styledegree scales the difference from 1.0
+OFFLINE_TTS_STYLE_RATES = {
+    'excited': 1.1, 'cheerful': 1.08, 'chat': 0.95, 'sad': 0.85,
+    'newscast': 1.05, 'whispering': 0.85, 'shouting': 1.1,
+}
+OFFLINE_TTS_LATENCY = 0.0       # Mean seconds added per request, to load-test concurrency
+OFFLINE_TTS_REALTIME_FACTOR = 0.0  # Extra seconds per second of audio, as engines take longer on long text
+OFFLINE_TTS_FAILURE_RATE = 0.0  # Share of requests that fail, to exercise fallbacks
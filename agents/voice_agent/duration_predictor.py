@@ -0,0 +1,148 @@
+import json
+import re
+import numpy as np
+from typing import Dict, Iterable, List, Sequence, Tuple
+from .constants import (
+    DURATION_PRIOR_SEGMENTS,
+    OFFLINE_TTS_WORDS_PER_SECOND, OFFLINE_TTS_EDGE_SILENCE
+)
+
+WORD_PATTERN = re.compile(r"[\w'-]+")
+SENTENCE_PATTERN = re.compile(r"[.!?]+")
+CLAUSE_PATTERN = re.compile(r"[,;:]")
+
+class DurationPredictor:
+    """
+    Predicts a segment's spoken duration from its text before it is synthesized. A linear model
+    over words, sentence ends and clause breaks (words/sec plus punctuation pauses) is fitted on
+    every historical segment, then scaled by a speed factor per speaker role, style and
+    styledegree. Sparse groups are shrunk toward their parent group, so one odd segment cannot
+    swing a whole style.
+    """
+    
+    # Without history the model falls back to the offline engine's rates
+    DEFAULT_COEFFICIENTS = (1.0 / OFFLINE_TTS_WORDS_PER_SECOND, 0.45, 0.25, 2 * OFFLINE_TTS_EDGE_SILENCE)
+    
+    def __init__(self, prior_segments: float = DURATION_PRIOR_SEGMENTS):
+        self.prior_segments = prior_segments
+        self.coefficients = np.array(self.DEFAULT_COEFFICIENTS)
+        self.factors: Dict[tuple, float] = {}
+        self.segments_fitted = 0
+    
+    @staticmethod
+    def load_segments(timing_files: Iterable[str]) -> List[List[Dict]]:
+        """Spoken segments of each timing file; unreadable files are skipped"""
+        lessons = []
+        for path in timing_files:
+            try:
+                with open(path, 'r') as f:
+                    timing_data = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Could not read timing file {path}: {e}")
+                continue
+            lessons.append([
+                entry for entry in timing_data
+                if entry.get('speaker') != 'end' and entry.get('duration') and entry.get('text')
+            ])
+        return lessons
+    
+    def fit(self, timing_files: Iterable[str]) -> "DurationPredictor":
+        return self.fit_segments([entry for lesson in self.load_segments(timing_files) for entry in lesson])
+    
+    def fit_segments(self, segments: Sequence[Dict]) -> "DurationPredictor":
+        """Fit the shared model, then the per-group speed factors, on timing entries"""
+        self.segments_fitted = len(segments)
+        self.factors = {}
+        if not segments:
+            self.coefficients = np.array(self.DEFAULT_COEFFICIENTS)
+            return self
+        
+        features = np.array([self.features(entry['text']) for entry in segments])
+        actual = np.array([entry['duration'] for entry in segments], dtype=float)
+        self.coefficients = self._fit_non_negative(features, actual)
+        
+        # Speed factors from the most general group to the most specific one
+        predicted = features @ self.coefficients
+        groups: Dict[tuple, List[int]] = {}
+        for i, entry in enumerate(segments):
+            for key in self.group_keys(entry['speaker'], entry.get('style', ''), entry.get('style_degree', 1.0)):
+                groups.setdefault(key, []).append(i)
+        for key in sorted(groups, key=len):
+            parent = self.factors.get(key[:-1], 1.0)
+            rows = groups[key]
+            predicted_sum = predicted[rows].sum()
+            prior = self.prior_segments * predicted_sum / len(rows)
+            self.factors[key] = float((actual[rows].sum() + prior * parent) / (predicted_sum + prior))
+        return self
+    
+    def predict(self, text: str, speaker: str, style: str, style_degree: float) -> float:
+        """Predicted duration in seconds"""
+        factor = 1.0
+        for key in self.group_keys(speaker, style, style_degree):
+            factor = self.factors.get(key, factor)
+        return max(float(np.dot(self.features(text), self.coefficients)) * factor, 0.1)
+    
+    def evaluate(self, timing_files: Sequence[str]) -> Dict:
+        """
+        Out-of-sample error on historical timing files: each lesson is predicted by a model fitted
+        on the other lessons, or each segment by the other segments when there is only one lesson
+        """
+        lessons = [lesson for lesson in self.load_segments(timing_files) if lesson]
+        folds = []
+        if len(lessons) > 1:
+            for i, lesson in enumerate(lessons):
+                training = [entry for j, other in enumerate(lessons) if j != i for entry in other]
+                folds.append((training, lesson))
+        elif lessons:
+            lesson = lessons[0]
+            folds = [(lesson[:i] + lesson[i + 1:], [entry]) for i, entry in enumerate(lesson)]
+        
+        errors = []
+        lesson_errors = []
+        model = DurationPredictor(self.prior_segments)
+        for training, held_out in folds:
+            model.fit_segments(training)
+            predicted = [model.predict(e['text'], e['speaker'], e.get('style', ''), e.get('style_degree', 1.0))
+                         for e in held_out]
+            actual = [e['duration'] for e in held_out]
+            errors += [(p - a, a) for p, a in zip(predicted, actual)]
+            lesson_errors.append(sum(predicted) - sum(actual))
+        
+        if not errors:
+            return {'files': len(lessons), 'segments': 0}
+        absolute = np.array([abs(error) for error, _ in errors])
+        relative = np.array([abs(error) / actual for error, actual in errors])
+        return {
+            'files': len(lessons),
+            'segments': len(errors),
+            'mae': float(absolute.mean()),
+            'mape': float(relative.mean()),
+            'max_error': float(absolute.max()),
+            'bias': float(np.mean([error for error, _ in errors])),
+            # Per-lesson total error only means something when whole lessons are held out
+            'lesson_mae': float(np.mean(np.abs(lesson_errors))) if len(lessons) > 1 else None,
+        }
+    
+    @staticmethod
+    def features(text: str) -> Tuple[int, int, int, int]:
+        """Words, sentence ends, clause breaks and a constant for lead-in and tail silence"""
+        return (len(WORD_PATTERN.findall(text)), len(SENTENCE_PATTERN.findall(text)),
+                len(CLAUSE_PATTERN.findall(text)), 1)
+    
+    @staticmethod
+    def group_keys(speaker: str, style: str, style_degree: float) -> List[tuple]:
+        """Groups from general to specific; the voice follows from the speaker role"""
+        role = 'narrator' if speaker.lower() == 'narrator' else 'character'
+        return [(role,), (role, style), (role, style, round(float(style_degree), 2))]
+    
+    def _fit_non_negative(self, features: np.ndarray, actual: np.ndarray) -> np.ndarray:
+        """Least squares with negative terms dropped and refitted, so no feature shortens speech"""
+        active = list(range(features.shape[1]))
+        while active:
+            solution, *_ = np.linalg.lstsq(features[:, active], actual, rcond=None)
+            if (solution >= 0).all():
+                coefficients = np.zeros(features.shape[1])
+                coefficients[active] = solution
+                return coefficients
+            active.pop(int(np.argmin(solution)))
+        return np.array(self.DEFAULT_COEFFICIENTS)
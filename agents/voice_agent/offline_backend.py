@@ -0,0 +1,113 @@
+import hashlib
+import re
+import time
+import zlib
+import numpy as np
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterator, Optional, Tuple
+from .constants import (
+    TTS_SAMPLE_RATE, TTS_CHANNELS,
+    OFFLINE_TTS_WORDS_PER_SECOND, OFFLINE_TTS_PAUSES, OFFLINE_TTS_EDGE_SILENCE,
+    OFFLINE_TTS_VOICE_RATES, OFFLINE_TTS_STYLE_RATES, OFFLINE_TTS_LATENCY, OFFLINE_TTS_FAILURE_RATE,
+    OFFLINE_TTS_REALTIME_FACTOR
+)
+from .synthesis_backend import SynthesisBackend
+
+WORD_PATTERN = re.compile(r"[\w'-]+")
+PAUSE_PATTERN = re.compile("[" + re.escape("".join(OFFLINE_TTS_PAUSES)) + "]")
+
+class OfflineSynthesisBackend(SynthesisBackend):
+    """
+    Deterministic local stand-in for a speech engine. Each text run lasts its word count at the
+    voice's and style's speaking rate plus a pause per punctuation mark, and is rendered as a quiet
+    tone pitched per voice. The same SSML always yields the same audio and bookmark offsets.
+    Optional latency and failure injection are also derived from the SSML, so load tests repeat.
+    """
+    
+    name = 'offline'
+    
+    def __init__(self, latency: float = OFFLINE_TTS_LATENCY, failure_rate: float = OFFLINE_TTS_FAILURE_RATE,
+                 realtime_factor: float = OFFLINE_TTS_REALTIME_FACTOR):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.realtime_factor = realtime_factor
+    
+    def synthesize(self, ssml: str) -> Optional[Tuple[bytes, Dict[str, float]]]:
+        digest = hashlib.sha256(ssml.encode('utf-8')).digest()
+        if self.latency:
+            time.sleep(self.latency * (0.5 + digest[0] / 255))
+        if digest[1] / 256 < self.failure_rate:
+            print(f"❌ Offline synthesis failed (injected)")
+            return None
+        
+        chunks = [self._silence(OFFLINE_TTS_EDGE_SILENCE)]
+        frames = len(chunks[0])
+        marks = {}
+        for kind, value, voice, style, degree in self._walk(ET.fromstring(ssml)):
+            if kind == 'mark':
+                marks[value] = frames / TTS_SAMPLE_RATE
+                continue
+            rate = OFFLINE_TTS_WORDS_PER_SECOND * self.rate_factor(voice, style, degree)
+            for word_run, pauses in self._phrases(value):
+                chunks.append(self._tone(word_run / rate, voice))
+                chunks.append(self._silence(pauses))
+                frames += len(chunks[-2]) + len(chunks[-1])
+        chunks.append(self._silence(OFFLINE_TTS_EDGE_SILENCE))
+        
+        samples = np.concatenate(chunks)
+        if self.realtime_factor:
+            time.sleep(self.realtime_factor * len(samples) / TTS_SAMPLE_RATE)
+        if TTS_CHANNELS > 1:
+            samples = np.repeat(samples, TTS_CHANNELS)
+        return samples.tobytes(), marks
+    
+    def identity(self) -> tuple:
+        return (
+            self.name, OFFLINE_TTS_WORDS_PER_SECOND, sorted(OFFLINE_TTS_PAUSES.items()),
+            OFFLINE_TTS_EDGE_SILENCE, sorted(OFFLINE_TTS_VOICE_RATES.items()),
+            sorted(OFFLINE_TTS_STYLE_RATES.items()),
+        )
+    
+    @staticmethod
+    def rate_factor(voice: str, style: str, degree: float) -> float:
+        """Relative speaking rate of a voice and style; styledegree scales the style's effect"""
+        style_rate = OFFLINE_TTS_STYLE_RATES.get(style, 1.0)
+        return OFFLINE_TTS_VOICE_RATES.get(voice, 1.0) * (1.0 + (style_rate - 1.0) * degree)
+    
+    def _walk(self, element, voice: str = '', style: str = '', degree: float = 1.0) -> Iterator[tuple]:
+        """(kind, value, voice, style, styledegree) for text runs and bookmarks in document order"""
+        tag = element.tag.split('}')[-1]
+        if tag == 'voice':
+            voice = element.get('name', voice)
+        elif tag == 'express-as':
+            style = element.get('style', style)
+            degree = float(element.get('styledegree', 1.0))
+        elif tag == 'bookmark':
+            yield 'mark', element.get('mark'), voice, style, degree
+        
+        if element.text and element.text.strip():
+            yield 'text', element.text, voice, style, degree
+        for child in element:
+            yield from self._walk(child, voice, style, degree)
+            if child.tail and child.tail.strip():
+                yield 'text', child.tail, voice, style, degree
+    
+    @staticmethod
+    def _phrases(text: str) -> Iterator[Tuple[int, float]]:
+        """(word count, pause seconds) for each stretch of text between punctuation marks"""
+        position = 0
+        for match in PAUSE_PATTERN.finditer(text):
+            yield len(WORD_PATTERN.findall(text[position:match.start()])), OFFLINE_TTS_PAUSES[match.group()]
+            position = match.end()
+        yield len(WORD_PATTERN.findall(text[position:])), 0.0
+    
+    @staticmethod
+    def _silence(seconds: float) -> np.ndarray:
+        return np.zeros(int(round(seconds * TTS_SAMPLE_RATE)), dtype='<i2')
+    
+    @staticmethod
+    def _tone(seconds: float, voice: str) -> np.ndarray:
+        """A quiet tone with a pitch fixed per voice, so speakers stay distinguishable by ear"""
+        frequency = 140 + zlib.crc32(voice.encode('utf-8')) % 120
+        t = np.arange(int(round(seconds * TTS_SAMPLE_RATE))) / TTS_SAMPLE_RATE
+        return (2000 * np.sin(2 * np.pi * frequency * t)).astype('<i2')
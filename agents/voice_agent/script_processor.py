@@ -59,6 +59,24 @@ class ScriptProcessor:
 
         return segments
     
+    @staticmethod
+    def split_sentences(text: str, min_piece_words: int) -> List[str]:
+        """Split text at sentence boundaries, merging sentences shorter than min_piece_words into the next"""
+        pieces = []
+        buffer = []
+        for sentence in re.split(r'(?<=[.!?])\s+', text.strip()):
+            buffer.append(sentence)
+            if len(" ".join(buffer).split()) >= min_piece_words:
+                pieces.append(" ".join(buffer))
+                buffer = []
+        if buffer:
+            # A short tail joins the previous piece rather than becoming its own request
+            if pieces:
+                pieces[-1] += " " + " ".join(buffer)
+            else:
+                pieces.append(" ".join(buffer))
+        return pieces
+    
     @staticmethod
     def escape_xml_text(text: str) -> str:
         """Escape text for XML/SSML"""
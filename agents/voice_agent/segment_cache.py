@@ -0,0 +1,54 @@
+import struct
+from typing import Dict, Optional, Tuple
+from utils.disk_cache import DiskCache
+from .constants import (
+    TTS_CACHE_DIR, TTS_CACHE_MAX_BYTES, TTS_CACHE_MEMORY_BYTES,
+    TTS_OUTPUT_FORMAT, TTS_SAMPLE_RATE
+)
+
+_segment_cache: Optional[DiskCache] = None
+
+def get_segment_cache() -> DiskCache:
+    """Process-wide TTS segment cache shared by every job; its disk tier persists across runs"""
+    global _segment_cache
+    if _segment_cache is None:
+        _segment_cache = DiskCache(TTS_CACHE_DIR, TTS_CACHE_MAX_BYTES,
+                                   memory_max_bytes=TTS_CACHE_MEMORY_BYTES, suffix=".pcm")
+    return _segment_cache
+
+# Entries are the segment's duration in seconds followed by its raw PCM
+_HEADER = struct.Struct('<d')
+
+class SegmentCache:
+    """Caches synthesized segment audio under a hash of the SSML that produced it"""
+    
+    def __init__(self, backend_identity: tuple, cache: Optional[DiskCache] = None):
+        self.backend_identity = backend_identity
+        self.cache = cache if cache is not None else get_segment_cache()
+        self.hits = 0
+        self.misses = 0
+    
+    def make_key(self, ssml: str) -> str:
+        """Voice, style, styledegree and text all live in the SSML; the engine and format decide the bytes"""
+        return DiskCache.make_key('tts_segment', ssml, self.backend_identity, TTS_OUTPUT_FORMAT, TTS_SAMPLE_RATE)
+    
+    def get(self, ssml: str) -> Optional[Tuple[bytes, float]]:
+        """Return the cached (PCM, duration), or None on a miss"""
+        data = self.cache.get(self.make_key(ssml))
+        if data is None or len(data) < _HEADER.size:
+            self.misses += 1
+            return None
+        self.hits += 1
+        duration, = _HEADER.unpack_from(data)
+        return data[_HEADER.size:], duration
+    
+    def put(self, ssml: str, pcm: bytes, duration: float):
+        self.cache.put(self.make_key(ssml), _HEADER.pack(duration) + pcm)
+    
+    def stats(self) -> Dict:
+        """Hits and misses of this job, plus the shared cache's totals"""
+        return {'hits': self.hits, 'misses': self.misses, 'cache': self.cache.stats()}
+    
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
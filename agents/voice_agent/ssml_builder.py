@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional, Tuple
 
 #Builds SSML documents for Azure TTS
 class SSMLBuilder:
@@ -10,8 +10,22 @@ class SSMLBuilder:
     #Create SSML document with voice and style with degree control
     def create_ssml(self, text: str, voice_name: str, style: str, 
                     emotion: Optional[str] = None) -> str:
+        return self._speak(self._voice_block(text, voice_name, style, emotion))
+    
+    #Create one SSML document for several segments, each opened by a <bookmark> named by its mark
+    def create_batch_ssml(self, segments: List[Tuple[str, str, str, Optional[str], str]]) -> str:
+        blocks = [
+            self._voice_block(text, voice_name, style, emotion, mark)
+            for text, voice_name, style, emotion, mark in segments
+        ]
+        return self._speak("\n                    ".join(blocks))
+    
+    def _voice_block(self, text: str, voice_name: str, style: str,
+                     emotion: Optional[str] = None, mark: Optional[str] = None) -> str:
         # Clean text for XML
         clean_text = self.script_processor.escape_xml_text(text)
+        if mark:
+            clean_text = f'<bookmark mark="{mark}"/>{clean_text}'
         
         # Get style degree if emotion provided
         style_degree_attr = ""
@@ -20,13 +34,14 @@ class SSMLBuilder:
             if degree != 1.0:
                 style_degree_attr = f' styledegree="{degree}"'
         
-        # Create SSML with style degree
-        ssml = f"""<speak version="1.0" xmlns="http://www.w3.org/2001/10/synthesis" xmlns:mstts="https://www.w3.org/2001/mstts" xml:lang="en-US">
-                    <voice name="{voice_name}">
+        return f"""<voice name="{voice_name}">
                         <mstts:express-as style="{style}"{style_degree_attr}>
                             {clean_text}
                         </mstts:express-as>
-                    </voice>
+                    </voice>"""
+    
+    @staticmethod
+    def _speak(body: str) -> str:
+        return f"""<speak version="1.0" xmlns="http://www.w3.org/2001/10/synthesis" xmlns:mstts="https://www.w3.org/2001/mstts" xml:lang="en-US">
+                    {body}
                 </speak>"""
-        
-        return ssml
\ No newline at end of file
@@ -0,0 +1,29 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Tuple
+
+class SynthesisBackend(ABC):
+    """
+    Interface between AudioSynthesizer and a speech engine. Backends turn one SSML document
+    into raw PCM in the TTS_OUTPUT_FORMAT layout (TTS_SAMPLE_RATE, 16-bit, TTS_CHANNELS) and
+    report where each <bookmark> mark was reached.
+    """
+    
+    name = 'backend'
+    
+    @abstractmethod
+    def synthesize(self, ssml: str) -> Optional[Tuple[bytes, Dict[str, float]]]:
+        """(PCM, {mark: audio offset in seconds}), or None if synthesis failed"""
+    
+    def identity(self) -> tuple:
+        """Everything that decides the audio besides the SSML, for cache keys"""
+        return (self.name,)
+
+def create_synthesis_backend(name: str) -> SynthesisBackend:
+    """Backend by name; engines are imported lazily so the offline one needs no Azure SDK"""
+    if name == 'azure':
+        from .azure_backend import AzureSynthesisBackend
+        return AzureSynthesisBackend()
+    if name == 'offline':
+        from .offline_backend import OfflineSynthesisBackend
+        return OfflineSynthesisBackend()
+    raise ValueError(f"Unknown TTS backend: {name}")
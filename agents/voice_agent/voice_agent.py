@@ -1,35 +1,45 @@
-import azure.cognitiveservices.speech as speechsdk
-import os
 import json
-from dotenv import load_dotenv
-from typing import Dict, List, Tuple
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
 
 # Import modular components
 from .style_manager import StyleManager
 from .script_processor import ScriptProcessor
 from .ssml_builder import SSMLBuilder
 from .audio_synthesizer import AudioSynthesizer
-from .constants import TITLE_SILENCE_MS, SEGMENT_PADDING_MS, END_SILENCE_MS
-
-load_dotenv()
+from .audio_assembler import AudioAssembler
+from .audio_encoder import AudioEncoder
+from .segment_cache import SegmentCache
+from .synthesis_backend import SynthesisBackend, create_synthesis_backend
+from .constants import (
+    TTS_MAX_CONCURRENCY, TTS_SYNTHESIS_MODE, TTS_BATCH_MAX_SEGMENTS,
+    TTS_BATCH_MAX_CHARS, TTS_SAMPLE_RATE, TTS_BACKEND, TTS_STREAM_ENCODING,
+    TTS_SPLIT_SENTENCES, TTS_SPLIT_MIN_WORDS, TTS_SPLIT_MIN_PIECE_WORDS
+)
 
 class VoiceAgent():
     """Main Voice Agent for text-to-speech synthesis with emotions"""
     
-    def __init__(self):
-        # Azure TTS configuration
-        self.speech_key = os.getenv("AZURE_OPENAI_TTS_KEY")
-        self.speech_region = os.getenv("AZURE_OPENAI_TTS_REGION")
-        self.speech_config = speechsdk.SpeechConfig(
-            subscription=self.speech_key,
-            region=self.speech_region
-        )
+    def __init__(self, max_concurrency: int = TTS_MAX_CONCURRENCY, synthesis_mode: str = TTS_SYNTHESIS_MODE,
+                 use_cache: bool = True, backend: Optional[SynthesisBackend] = None,
+                 stream_encoding: bool = TTS_STREAM_ENCODING, split_sentences: bool = TTS_SPLIT_SENTENCES):
+        # Speech engine: Azure by default, or the offline stand-in for benchmarks and CI
+        backend = backend or create_synthesis_backend(TTS_BACKEND)
         
         # Initialize components
         self.style_manager = StyleManager()
         self.script_processor = ScriptProcessor()
         self.ssml_builder = SSMLBuilder(self.style_manager, self.script_processor)
-        self.audio_synthesizer = AudioSynthesizer(self.speech_config)
+        self.audio_synthesizer = AudioSynthesizer(backend)
+        self.audio_assembler = AudioAssembler()
+        self.audio_encoder = AudioEncoder()
+        self.max_concurrency = max(1, max_concurrency)
+        self.synthesis_mode = synthesis_mode
+        self.segment_cache = SegmentCache(backend.identity()) if use_cache else None
+        self.stream_encoding = stream_encoding
+        # Batched requests already carry whole lines, so splitting only applies per segment
+        self.split_sentences = split_sentences and synthesis_mode != 'batched'
 
     def run(self, input_data: Dict, **kwargs) -> Dict:
         """
@@ -50,31 +60,32 @@ class VoiceAgent():
         base_style = self._determine_base_style(character)
         segments = self.script_processor.parse_script_with_emotions(full_script, character["name"])
         
-        # Synthesize segments and collect timing
-        segment_infos, timing_data = self._synthesize_segments(
-            segments, character, base_style
-        )
+        # Synthesize segments; segment audio stays in memory as PCM and arrives in script order
+        synthesized = self._synthesize_segments(segments, character, base_style)
         
-        # Add end slide timing
-        total_duration = self._calculate_total_duration(timing_data)
-        timing_data.append(self._create_end_slide_timing(total_duration))
-        
-        # Combine audio segments
-        self.audio_synthesizer.combine_audio_segments(segment_infos, output_file)
+        if self.stream_encoding:
+            # Each segment goes to the encoder as soon as it and everything before it is ready
+            timing_data = self.audio_encoder.encode_stream(
+                output_file, lambda write: self.audio_assembler.stream(
+                    synthesized, self._create_end_slide_timing(), write
+                )
+            )
+        else:
+            # Lay out the whole lesson once; timing comes from the same sample offsets as the audio
+            samples, timing_data = self.audio_assembler.assemble(
+                list(synthesized), self._create_end_slide_timing()
+            )
+            self.audio_encoder.encode(samples, output_file)
         print(f"✅ Expressive audio saved to {output_file}")
         
         # Save timing data
         self._save_timing_data(timing_file, timing_data)
         
-        # Cleanup
-        temp_paths = [path for path, _ in segment_infos]
-        self.audio_synthesizer.cleanup_temp_files(temp_paths)
-        
         # Return result
         return {
             "audio_path": output_file,
             "timing": timing_data,
-            "total_duration": total_duration + (END_SILENCE_MS / 1000.0)
+            "total_duration": timing_data[-1]["end_time"]
         }
     
     def _setup_output_paths(self, character_name: str, lesson_title: str) -> Tuple[str, str]:
@@ -93,79 +104,214 @@ class VoiceAgent():
         return base_style
     
     def _synthesize_segments(self, segments: List[Dict], character: Dict, 
-                           base_style: str) -> Tuple[List[Tuple[str, float]], List[Dict]]:
-        """Synthesize all segments and return segment info and timing data"""
-        segment_infos = []
-        timing_data = []
-        current_time = TITLE_SILENCE_MS / 1000.0  # Start after title slide
-        
-        for i, segment in enumerate(segments):
-            # Extract segment data
-            speaker = segment['speaker']
-            text = segment['text']
-            emotion = segment.get('emotion', 'neutral')
-            
-            # Determine voice and style
-            voice_name = self.style_manager.get_voice_for_speaker(
-                speaker, character["name"], character.get("gender", "female").lower()
-            )
-            style = self.style_manager.get_style_for_emotion(
-                emotion, base_style, speaker, voice_name
-            )
-            style_degree = self.style_manager.get_style_degree(emotion)
-            
-            print(f"🎙️ Synthesizing [{speaker}] with emotion '{emotion}' → style '{style}' (degree: {style_degree})")
-            
-            # Create SSML and synthesize
-            ssml = self.ssml_builder.create_ssml(text, voice_name, style, emotion)
-            temp_path = f"output/temp_segment_{i}.mp3"
-            
-            success = self.audio_synthesizer.synthesize_ssml(ssml, temp_path)
-            if not success:
-                print(f"❌ SSML synthesis failed for segment {i}. Skipping this segment.")
-                continue
-            
-            # Measure duration
-            duration = self.audio_synthesizer.measure_segment_duration(temp_path)
-            segment_infos.append((temp_path, duration))
-            
-            # Create timing entry
-            timing_entry = {
-                "speaker": speaker,
-                "text": text,
-                "emotion": emotion,
-                "style": style,
-                "style_degree": style_degree,
-                "start_time": current_time,
-                "duration": duration,
-                "end_time": current_time + duration
-            }
-            timing_data.append(timing_entry)
-            
-            # Update current time (including padding)
-            current_time += duration + (SEGMENT_PADDING_MS / 1000.0)
-        
-        return segment_infos, timing_data
+                           base_style: str) -> Iterator[Tuple[Dict, bytes]]:
+        """
+        Synthesize all segments with up to max_concurrency requests in flight and yield
+        (timing entry, PCM) pairs in script order, each as soon as it and every earlier
+        segment are done. Times are filled in by the assembler, so they do not depend on the
+        order requests complete in. Segments found in the cache are not synthesized again,
+        in 'batched' mode consecutive segments share a request, and long segments split into
+        sentences are synthesized piece by piece and joined back together.
+        """
+        jobs = [
+            self._prepare_segment(i, segment, character, base_style)
+            for i, segment in enumerate(segments)
+        ]
+        cached = self._lookup_cached(jobs)
+        # Finished segments by index: PCM, or None if synthesis failed
+        done = {i: pcm for i, pcm in enumerate(cached) if pcm is not None}
+        pending = [job for job in jobs if job['index'] not in done]
+        
+        # Requests as (segments, piece): a piece index for one sentence piece of a split segment
+        if self.synthesis_mode == 'batched':
+            requests = [(batch, None) for batch in self._pack_batches(pending)]
+        else:
+            requests = []
+            for job in pending:
+                if len(job['pieces']) > 1:
+                    requests += [([job], piece) for piece in range(len(job['pieces']))]
+                else:
+                    requests.append(([job], None))
+        
+        workers = min(self.max_concurrency, len(requests)) or 1
+        if workers > 1 or len(requests) != len(pending):
+            print(f"⚡ Synthesizing {len(pending)} segments in {len(requests)} requests, {workers} in flight")
+        
+        next_index = 0
+        pieces_done = {}
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # Requests are submitted a bounded window ahead, so finished audio waiting on an
+            # earlier segment never piles up beyond a few requests' worth
+            queued = deque(requests)
+            window = deque()
+            while True:
+                while queued and len(window) < workers * 2:
+                    batch, piece = queued.popleft()
+                    window.append((batch, piece, executor.submit(self._synthesize_request, batch, piece)))
+                
+                if window:
+                    batch, piece, future = window.popleft()
+                    results, cacheable = future.result()
+                    for job, pcm in zip(batch, results):
+                        if piece is not None:
+                            pieces = pieces_done.setdefault(job['index'], [])
+                            pieces.append(pcm)
+                            if len(pieces) < len(job['pieces']):
+                                continue
+                            # Pieces arrive in order and are joined sample to sample, with no gap
+                            del pieces_done[job['index']]
+                            pcm = None if None in pieces else b''.join(pieces)
+                        
+                        done[job['index']] = pcm
+                        if pcm is not None and cacheable and self.segment_cache is not None:
+                            self.segment_cache.put(job['cache_ssml'], pcm, self.audio_assembler.duration(pcm))
+                
+                while next_index in done:
+                    job, pcm = jobs[next_index], done.pop(next_index)
+                    next_index += 1
+                    if pcm is None:
+                        print(f"❌ SSML synthesis failed for segment {job['index']}. Skipping this segment.")
+                        continue
+                    
+                    yield job['timing_entry'], pcm
+                
+                if not window and not queued:
+                    break
+    
+    def _resolve_segment(self, segment: Dict, character: Dict, base_style: str) -> Tuple[Dict, str]:
+        """Timing entry (without times) and voice name for one segment"""
+        # Extract segment data
+        speaker = segment['speaker']
+        emotion = segment.get('emotion', 'neutral')
+        
+        # Determine voice and style
+        voice_name = self.style_manager.get_voice_for_speaker(
+            speaker, character["name"], character.get("gender", "female").lower()
+        )
+        style = self.style_manager.get_style_for_emotion(
+            emotion, base_style, speaker, voice_name
+        )
+        timing_entry = {
+            "speaker": speaker,
+            "text": segment['text'],
+            "emotion": emotion,
+            "style": style,
+            "style_degree": self.style_manager.get_style_degree(emotion)
+        }
+        return timing_entry, voice_name
     
-    def _calculate_total_duration(self, timing_data: List[Dict]) -> float:
-        """Calculate total duration from timing data"""
-        if timing_data:
-            last_segment = timing_data[-1]
-            # Add padding after last segment
-            return last_segment["end_time"] + (SEGMENT_PADDING_MS / 1000.0)
-        return TITLE_SILENCE_MS / 1000.0
+    def _prepare_segment(self, index: int, segment: Dict, character: Dict, base_style: str) -> Dict:
+        """Resolve voice, style and SSML for one segment"""
+        timing_entry, voice_name = self._resolve_segment(segment, character, base_style)
+        speaker, text, emotion = timing_entry['speaker'], timing_entry['text'], timing_entry['emotion']
+        style, style_degree = timing_entry['style'], timing_entry['style_degree']
+        
+        print(f"🎙️ Synthesizing [{speaker}] with emotion '{emotion}' → style '{style}' (degree: {style_degree})")
+        
+        ssml = self.ssml_builder.create_ssml(text, voice_name, style, emotion)
+        pieces = [ssml]
+        if self.split_sentences and len(text.split()) >= TTS_SPLIT_MIN_WORDS:
+            # Every piece keeps the segment's voice, style and styledegree
+            pieces = [
+                self.ssml_builder.create_ssml(sentence, voice_name, style, emotion)
+                for sentence in self.script_processor.split_sentences(text, TTS_SPLIT_MIN_PIECE_WORDS)
+            ]
+        
+        return {
+            "index": index,
+            "timing_entry": timing_entry,
+            "text": text,
+            "emotion": emotion,
+            "style": style,
+            "voice_name": voice_name,
+            "ssml": ssml,
+            "pieces": pieces,
+            # Split audio differs from a whole-line request, so it is cached under its pieces
+            "cache_ssml": "".join(pieces),
+        }
+    
+    def _lookup_cached(self, jobs: List[Dict]) -> List[Optional[bytes]]:
+        """Cached PCM for each segment in script order, None where it must be synthesized"""
+        if self.segment_cache is None:
+            return [None] * len(jobs)
+        
+        self.segment_cache.reset_stats()
+        results = []
+        for job in jobs:
+            cached = self.segment_cache.get(job['cache_ssml'])
+            results.append(cached[0] if cached is not None else None)
+        
+        stats = self.segment_cache.stats()
+        print(f"🗃️ TTS cache: {stats['hits']} reused, {stats['misses']} to synthesize "
+              f"(lifetime hit rate {stats['cache']['hit_rate']:.0%})")
+        return results
+    
+    def _synthesize_request(self, batch: List[Dict], piece: Optional[int]) -> Tuple[List[Optional[bytes]], bool]:
+        """
+        PCM for each segment of a request, or for the one sentence piece it asks for, and whether
+        it may be cached. Segments cut from a batched request keep only part of the request's
+        lead-in and tail, so their audio differs from a whole-line request and is not cached.
+        """
+        if piece is not None:
+            return [self.audio_synthesizer.synthesize_pcm(batch[0]['pieces'][piece])], True
+        return self._synthesize_batch(batch)
+    
+    def _synthesize_job(self, job: Dict) -> Optional[bytes]:
+        """Synthesize one segment to PCM; None if synthesis failed"""
+        return self.audio_synthesizer.synthesize_pcm(job['ssml'])
+    
+    def _pack_batches(self, jobs: List[Dict]) -> List[List[Dict]]:
+        """Group consecutive segments into requests bounded by segment count and text length"""
+        batches = []
+        characters = 0
+        for job in jobs:
+            if (not batches or len(batches[-1]) >= TTS_BATCH_MAX_SEGMENTS
+                    or characters + len(job['text']) > TTS_BATCH_MAX_CHARS):
+                batches.append([])
+                characters = 0
+            batches[-1].append(job)
+            characters += len(job['text'])
+        return batches
+    
+    def _synthesize_batch(self, batch: List[Dict]) -> Tuple[List[Optional[bytes]], bool]:
+        """
+        Synthesize consecutive segments in one request, each opened by a bookmark, and cut the
+        audio apart at the bookmark offsets. Falls back to one request per segment on failure.
+        The flag is True when every segment came from its own whole-line request.
+        """
+        if len(batch) == 1:
+            return [self._synthesize_job(batch[0])], True
+        
+        marks = [f"segment_{job['index']}" for job in batch]
+        ssml = self.ssml_builder.create_batch_ssml([
+            (job['text'], job['voice_name'], job['style'], job['emotion'], mark)
+            for job, mark in zip(batch, marks)
+        ])
+        result = self.audio_synthesizer.synthesize_marked_pcm(ssml)
+        if result is None or any(mark not in result[1] for mark in marks):
+            print(f"⚠️ Batched synthesis failed for segments {batch[0]['index']}-{batch[-1]['index']}, "
+                  f"synthesizing them one by one")
+            return [self._synthesize_job(job) for job in batch], True
+        
+        pcm, offsets = result
+        # Each segment runs from its mark to the next one, so no audio between marks is dropped;
+        # the first also keeps the lead-in before its mark, as a single-segment request would
+        frame_bytes = self.audio_synthesizer.frame_bytes
+        cuts = [0]
+        for mark in marks[1:]:
+            cut = min(int(round(offsets[mark] * TTS_SAMPLE_RATE)) * frame_bytes, len(pcm))
+            cuts.append(max(cut, cuts[-1]))
+        cuts.append(len(pcm))
+        return [pcm[start:end] for start, end in zip(cuts, cuts[1:])], False
     
-    def _create_end_slide_timing(self, start_time: float) -> Dict:
-        """Create timing entry for end slide"""
+    def _create_end_slide_timing(self) -> Dict:
+        """Create timing entry for end slide; its times come from the assembler"""
         return {
             "speaker": "end",
             "text": "Thank you for learning with us!",
             "emotion": "cheerful",
             "style": "cheerful",
-            "style_degree": 1.1,
-            "start_time": start_time,
-            "duration": END_SILENCE_MS / 1000.0,
-            "end_time": start_time + (END_SILENCE_MS / 1000.0)
+            "style_degree": 1.1
         }
     
     def _save_timing_data(self, timing_file: str, timing_data: List[Dict]):
@@ -7,6 +7,7 @@ from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.responses import FileResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
+import asyncio
 import uuid
 from datetime import datetime
 from pathlib import Path
@@ -17,7 +18,9 @@ from agents.character_agent import CharacterAgent
 from agents.script_agent import ScriptAgent
 from agents.voice_agent import VoiceAgent
 from agents.visual_agent import VisualAgent
+from agents.visual_agent.constants import RENDER_PROFILES
 from utils.db import init_db
+from utils.llm_gateway import get_llm_gateway
 from utils.qa import run_video_qa
 
 # Initialize FastAPI
@@ -68,6 +71,7 @@ character_agent = None
 script_agent = None
 voice_agent = None
 visual_agent = None
+preview_agents = {}  # Visual agents for non-default render profiles, created on first use
 
 # ==================== Request Models ====================
 
@@ -90,11 +94,23 @@ class VideoRequest(BaseModel):
     script_id: str
     character_id: str
     voice_id: str
+    profile: str = "production"  # "draft" renders a fast low-resolution preview
 
 class PipelineRequest(BaseModel):
     topic: str
     character_name: str = "Zara"
     num_lessons: int = 1
+    profile: str = "production"
+
+def get_visual_agent(profile: str) -> VisualAgent:
+    """Visual agent for a render profile; the startup agent serves the default profile"""
+    if profile not in RENDER_PROFILES:
+        raise HTTPException(status_code=400, detail=f"Unknown render profile: {profile}")
+    if visual_agent is not None and visual_agent.profile.name == profile:
+        return visual_agent
+    if profile not in preview_agents:
+        preview_agents[profile] = VisualAgent(profile=profile)
+    return preview_agents[profile]
 
 # ==================== Individual API Endpoints ====================
 # Health Check
@@ -146,17 +162,18 @@ async def generate_script(request: ScriptRequest):
     character = character_store[request.character_id]["data"]
     
     print(f"📝 Generating scripts...")
-    scripts = script_agent.run({
+    scripts, failed_lessons = script_agent.generate_scripts({
         "character": character,
         "lessons": curriculum["lessons"]
     })
     
     script_store[script_id] = {
         "id": script_id,
-        "scripts": scripts
+        "scripts": scripts,
+        "failed_lessons": failed_lessons
     }
     
-    return {"script_id": script_id, "scripts": scripts}
+    return {"script_id": script_id, "scripts": scripts, "failed_lessons": failed_lessons}
 
 # Generate Voice using script_id and character_id
 @app.post("/api/voice/generate")
@@ -195,8 +212,9 @@ async def generate_video(request: VideoRequest):
     script_data = script_store[request.script_id]
     character = character_store[request.character_id]["data"]
     voice_data = voice_store[request.voice_id]
+    agent = get_visual_agent(request.profile)
     
-    print(f"🎬 Generating video...")
+    print(f"🎬 Generating video ({request.profile})...")
     videos = []
     
     for script_item, voice_item in zip(script_data["scripts"], voice_data["voice_data"]):
@@ -211,7 +229,7 @@ async def generate_video(request: VideoRequest):
         if voice_item.get("timing_data"):
             video_input["timing"] = voice_item["timing_data"]
         
-        video_path = visual_agent.run(video_input)
+        video_path = agent.run(video_input)
         
         videos.append({
             "lesson": script_item["lesson"],
@@ -226,11 +244,29 @@ async def generate_video(request: VideoRequest):
     return {"video_id": video_id, "videos": videos}
 
 
+def prepare_slides(script_id: str, character: dict, profile: str):
+    """Render every lesson's slides and overlay sprites ahead of its audio"""
+    agent = get_visual_agent(profile)
+    for script_item in script_store[script_id]["scripts"]:
+        try:
+            agent.prepare({
+                "character": character,
+                "lesson_title": script_item["lesson"],
+                "script": script_item["script"],
+                "overlay_data": script_item.get("overlay_data", {})
+            })
+        except Exception as e:
+            print(f"⚠️ Slides for {script_item['lesson']} were not prepared, they will be rendered with the video: {e}")
+
+
 # ==================== Pipeline Endpoint Start - Endpoint used in the frontend ====================
 
 @app.post("/api/pipeline/start")
 async def start_pipeline(request: PipelineRequest, background_tasks: BackgroundTasks):
     """Start the full pipeline"""
+    # Reject an unknown profile before any LLM or TTS work is paid for
+    if request.profile not in RENDER_PROFILES:
+        raise HTTPException(status_code=400, detail=f"Unknown render profile: {request.profile}")
     job_id = str(uuid.uuid4())
     
     job_store[job_id] = {
@@ -239,7 +275,8 @@ async def start_pipeline(request: PipelineRequest, background_tasks: BackgroundT
         "topic": request.topic,
         "result": None,
         "error": None,
-        "curriculum_info": None
+        "curriculum_info": None,
+        "failed_lessons": []
     }
     
     background_tasks.add_task(
@@ -247,12 +284,14 @@ async def start_pipeline(request: PipelineRequest, background_tasks: BackgroundT
         job_id,
         request.topic,
         request.character_name,
-        request.num_lessons
+        request.num_lessons,
+        request.profile
     )
     
     return {"job_id": job_id}
 
-async def run_pipeline(job_id: str, topic: str, character_name: str, num_lessons: int):
+async def run_pipeline(job_id: str, topic: str, character_name: str, num_lessons: int,
+                       profile: str = "production"):
     """Run the full pipeline with comprehensive logging"""
     logs = []  # List to collect all logs to show at the end
     
@@ -299,7 +338,16 @@ async def run_pipeline(job_id: str, topic: str, character_name: str, num_lessons
         script_req = ScriptRequest(curriculum_id=curriculum_id, character_id=character_id)
         script_resp = await generate_script(script_req)
         script_id = script_resp["script_id"]
-        add_log(f"✅ Scripts ready with overlay data")
+        failed_lessons = script_resp["failed_lessons"]
+        job_store[job_id]["failed_lessons"] = failed_lessons
+        for failed in failed_lessons:
+            add_log(f"⚠️ Script failed for lesson '{failed['lesson']}', skipping it: {failed['error']}")
+        add_log(f"✅ Scripts ready with overlay data ({len(script_resp['scripts'])} of "
+                f"{len(curr_resp['lessons'])} lesson(s))")
+        
+        # Slides only depend on the scripts, so they render in a worker thread while the voice is synthesized;
+        # the visual agent's lock keeps this from overlapping another job's video render
+        slide_prep = asyncio.get_running_loop().run_in_executor(None, prepare_slides, script_id, character, profile)
         
         # 4. Voice
         add_log(f"🎤 Creating expressive voice narration...")
@@ -309,8 +357,10 @@ async def run_pipeline(job_id: str, topic: str, character_name: str, num_lessons
         add_log(f"✅ Voice synthesis complete with timing data")
         
         # 5. Video
+        await slide_prep
         add_log(f"🎬 Generating video with synchronized overlays...")
-        video_req = VideoRequest(script_id=script_id, character_id=character_id, voice_id=voice_id)
+        video_req = VideoRequest(script_id=script_id, character_id=character_id, voice_id=voice_id,
+                                 profile=profile)
         video_resp = await generate_video(video_req)
         add_log(f"✅ Video generation complete")
         
@@ -384,6 +434,11 @@ async def get_job_status(job_id: str):
         raise HTTPException(status_code=404, detail="Job not found")
     return job_store[job_id]
 
+@app.get("/api/llm/stats")
+async def get_llm_stats():
+    """Per-agent LLM request counts, token usage and latency"""
+    return get_llm_gateway().stats()
+
 @app.get("/api/download/{filename}")
 async def download_file(filename: str):
     """Download file"""
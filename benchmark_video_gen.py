@@ -0,0 +1,261 @@
+"""
+Benchmark video encoding on the sample lesson in output/ without calling TTS or LLM APIs.
+Run with no arguments to compare encoders, with "tuning" to compare encode settings, with
+"workers" to time parallel chunk encoding, with "pipeline" to time voice and video together
+using the offline speech engine, or with "predictor" to report the audio duration predictor's
+error on the timing files in output/.
+"""
+
+from agents.visual_agent import VisualAgent
+from agents.voice_agent import VoiceAgent
+from agents.voice_agent.offline_backend import OfflineSynthesisBackend
+from agents.voice_agent.duration_predictor import DurationPredictor
+from agents.voice_agent.constants import TTS_TIMING_HISTORY
+from moviepy.editor import VideoFileClip
+from moviepy.config import get_setting
+import numpy as np
+import glob
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+CHARACTER = {
+    "name": "David",
+    "gender": "male",
+    "description": "A curious and inventive educator. They are enthusiastic, warm, and energetic.",
+    "voice_style": "clear and engaging",
+    "avatar_id": 1
+}
+LESSON_TITLE = "Introduction_to_Retrieval-Augmented_Generation_(RAG)"
+AUDIO_FILE = f"output/David_{LESSON_TITLE}.mp3"
+TIMING_FILE = f"output/David_{LESSON_TITLE}_timing.json"
+HIGHLIGHT_KEYWORDS = ["RAG", "retrieval", "generation", "language models", "indexing", "algorithms"]
+
+def load_sample_lesson():
+    """Rebuild the sample lesson input from its timing file"""
+    with open(TIMING_FILE, 'r') as f:
+        timing_data = json.load(f)
+
+    # Every timing entry carries speaker, emotion and text, which is all the script parser needs
+    script = "\n".join(
+        f"{segment['speaker']} ({segment['emotion']}): {segment['text']}"
+        for segment in timing_data if segment['speaker'] != 'end'
+    )
+
+    return {
+        "character": CHARACTER,
+        "lesson_title": LESSON_TITLE,
+        "script": script,
+        "voice_path": AUDIO_FILE,
+        "timing": timing_data,
+        "overlay_data": {"highlight_keywords": HIGHLIGHT_KEYWORDS},
+    }
+
+def time_encoder(encoder: str, input_data: dict, output_dir: str, **agent_options):
+    """Run the visual agent with one encoder and return (seconds, output_path)"""
+    visual_agent = VisualAgent(encoder=encoder, output_dir=output_dir, **agent_options)
+    start = time.perf_counter()
+    output_path = visual_agent.run(input_data)
+    return time.perf_counter() - start, output_path
+
+def warm_caches(input_data: dict):
+    """
+    Fill the process-wide slide and sprite caches (and their disk tier) for the lesson, so every
+    timed run starts from the same warm cache instead of the first one paying for the renders
+    """
+    print("🔥 Warming the slide and sprite caches before the timed runs")
+    VisualAgent(encoder="still").prepare(input_data)
+
+def compare_videos(path_a: str, path_b: str, samples: int = 40):
+    """Compare decoded frames of two videos at evenly spaced timestamps"""
+    clip_a, clip_b = VideoFileClip(path_a), VideoFileClip(path_b)
+    try:
+        duration = min(clip_a.duration, clip_b.duration)
+        diffs = []
+        for t in np.linspace(0, duration - 1.0 / clip_a.fps, samples):
+            frame_a = clip_a.get_frame(t).astype(np.int16)
+            frame_b = clip_b.get_frame(t).astype(np.int16)
+            diffs.append(np.abs(frame_a - frame_b).mean())
+        return {
+            "duration_a": clip_a.duration,
+            "duration_b": clip_b.duration,
+            "mean_abs_diff": float(np.mean(diffs)),
+            "max_abs_diff": float(np.max(diffs)),
+        }
+    finally:
+        clip_a.close()
+        clip_b.close()
+
+def benchmark_encoders():
+    """Time the MoviePy compositing path against the still-frame fast path"""
+    print("⏱️ Benchmarking video encoders on the sample RAG lesson\n")
+
+    if not os.path.exists(AUDIO_FILE) or not os.path.exists(TIMING_FILE):
+        print(f"❌ Sample lesson not found: {AUDIO_FILE}")
+        return
+
+    input_data = load_sample_lesson()
+    warm_caches(input_data)
+
+    with tempfile.TemporaryDirectory(prefix="bench_") as temp_dir:
+        results = {}
+        for encoder in ("moviepy", "still"):
+            encoder_dir = os.path.join(temp_dir, encoder)
+            elapsed, output_path = time_encoder(encoder, input_data, encoder_dir)
+            results[encoder] = (elapsed, output_path)
+            print(f"\n⏱️ {encoder}: {elapsed:.2f}s")
+
+        comparison = compare_videos(results["moviepy"][1], results["still"][1])
+
+    print("\n📊 Results:")
+    for encoder, (elapsed, _) in results.items():
+        print(f"  {encoder:>8}: {elapsed:7.2f}s")
+    print(f"  speed-up: {results['moviepy'][0] / results['still'][0]:.1f}x")
+    print(f"  duration: {comparison['duration_a']:.2f}s vs {comparison['duration_b']:.2f}s")
+    print(f"  mean abs pixel diff: {comparison['mean_abs_diff']:.3f} "
+          f"(max {comparison['max_abs_diff']:.3f})")
+
+def keyframe_numbers(path: str):
+    """Frame numbers of the I-frames in a video, read from ffmpeg's showinfo filter"""
+    cmd = [get_setting("FFMPEG_BINARY"), '-i', path, '-vf', 'showinfo', '-an', '-f', 'null', '-']
+    output = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE).stderr.decode('utf8', errors='ignore')
+    return [int(m.group(1)) for m in re.finditer(r'n:\s*(\d+).*?type:I', output)]
+
+def benchmark_encode_tuning():
+    """Compare the fixed-bitrate encode with the slide-tuned CRF encode on the still-frame path"""
+    print("⏱️ Benchmarking encode settings on the sample RAG lesson\n")
+
+    if not os.path.exists(AUDIO_FILE) or not os.path.exists(TIMING_FILE):
+        print(f"❌ Sample lesson not found: {AUDIO_FILE}")
+        return
+
+    input_data = load_sample_lesson()
+    warm_caches(input_data)
+
+    with tempfile.TemporaryDirectory(prefix="bench_") as temp_dir:
+        results = {}
+        for tuning in ("bitrate", "slides"):
+            tuning_dir = os.path.join(temp_dir, tuning)
+            elapsed, output_path = time_encoder("still", input_data, tuning_dir, tuning=tuning)
+            results[tuning] = {
+                "seconds": elapsed,
+                "bytes": os.path.getsize(output_path),
+                "keyframes": keyframe_numbers(output_path),
+                "path": output_path,
+            }
+            print(f"\n⏱️ {tuning}: {elapsed:.2f}s, {results[tuning]['bytes'] / 1024:.0f} KiB")
+
+        comparison = compare_videos(results["bitrate"]["path"], results["slides"]["path"])
+
+    print("\n📊 Results:")
+    for tuning, result in results.items():
+        print(f"  {tuning:>8}: {result['seconds']:7.2f}s  {result['bytes'] / 1024:8.0f} KiB  "
+              f"{len(result['keyframes'])} keyframes")
+    print(f"  size: {results['slides']['bytes'] / results['bitrate']['bytes']:.0%} of the bitrate encode")
+    print(f"  slide-tuned keyframes at frames: {results['slides']['keyframes']}")
+    print(f"  mean abs pixel diff between encodes: {comparison['mean_abs_diff']:.3f} "
+          f"(max {comparison['max_abs_diff']:.3f})")
+
+def benchmark_encode_workers(worker_counts=(1, 2, 4)):
+    """Time the still-frame encoder with the lesson split into parallel chunks"""
+    print(f"⏱️ Benchmarking parallel chunk encoding on the sample RAG lesson ({os.cpu_count()} core(s))\n")
+
+    if not os.path.exists(AUDIO_FILE) or not os.path.exists(TIMING_FILE):
+        print(f"❌ Sample lesson not found: {AUDIO_FILE}")
+        return
+
+    input_data = load_sample_lesson()
+    warm_caches(input_data)
+
+    with tempfile.TemporaryDirectory(prefix="bench_") as temp_dir:
+        results = {}
+        for workers in worker_counts:
+            workers_dir = os.path.join(temp_dir, f"workers_{workers}")
+            elapsed, output_path = time_encoder("still", input_data, workers_dir, encode_workers=workers)
+            results[workers] = (elapsed, output_path)
+            print(f"\n⏱️ {workers} worker(s): {elapsed:.2f}s")
+
+        baseline = worker_counts[0]
+        comparisons = {
+            workers: compare_videos(results[baseline][1], path)
+            for workers, (_, path) in results.items() if workers != baseline
+        }
+
+    print("\n📊 Results:")
+    for workers, (elapsed, _) in results.items():
+        line = f"  {workers:>2} worker(s): {elapsed:7.2f}s  speed-up {results[baseline][0] / elapsed:.2f}x"
+        if workers in comparisons:
+            line += f"  mean abs pixel diff {comparisons[workers]['mean_abs_diff']:.3f}"
+        print(line)
+
+def benchmark_offline_pipeline(latency: float = 0.5):
+    """Run the voice and visual stages on the sample script with the offline speech engine"""
+    print(f"⏱️ Benchmarking the voice → video pipeline offline ({latency:.1f}s simulated TTS latency)\n")
+
+    if not os.path.exists(TIMING_FILE):
+        print(f"❌ Sample lesson not found: {TIMING_FILE}")
+        return
+
+    sample = load_sample_lesson()
+    lesson_title = "Offline_Pipeline_Benchmark"
+    voice_agent = VoiceAgent(use_cache=False, backend=OfflineSynthesisBackend(latency=latency))
+
+    start = time.perf_counter()
+    voice_result = voice_agent.run({
+        "character": CHARACTER,
+        "lesson_title": lesson_title,
+        "script": sample["script"],
+    })
+    voice_seconds = time.perf_counter() - start
+
+    try:
+        with tempfile.TemporaryDirectory(prefix="bench_") as temp_dir:
+            video_seconds, _ = time_encoder("still", {
+                **sample,
+                "lesson_title": lesson_title,
+                "voice_path": voice_result["audio_path"],
+                "timing": voice_result["timing"],
+            }, temp_dir)
+    finally:
+        os.remove(voice_result["audio_path"])
+        os.remove(voice_result["audio_path"].replace(".mp3", "_timing.json"))
+
+    print("\n📊 Results:")
+    print(f"     voice: {voice_seconds:7.2f}s  ({len(voice_result['timing']) - 1} segments, "
+          f"{voice_result['total_duration']:.1f}s of audio)")
+    print(f"     video: {video_seconds:7.2f}s")
+    print(f"     total: {voice_seconds + video_seconds:7.2f}s")
+
+def benchmark_duration_predictor():
+    """Held-out error of the duration predictor on every historical timing file"""
+    timing_files = sorted(glob.glob(TTS_TIMING_HISTORY))
+    print(f"⏱️ Evaluating the duration predictor on {len(timing_files)} timing file(s)\n")
+
+    report = DurationPredictor().evaluate(timing_files)
+    if not report['segments']:
+        print("❌ No timing data to evaluate")
+        return
+
+    print("📊 Results:")
+    print(f"  segments: {report['segments']} from {report['files']} file(s)")
+    print(f"       MAE: {report['mae']:.2f}s  ({report['mape']:.1%} of the segment)")
+    print(f" max error: {report['max_error']:.2f}s")
+    print(f"      bias: {report['bias']:+.2f}s")
+    if report['lesson_mae'] is not None:
+        print(f"lesson MAE: {report['lesson_mae']:.2f}s")
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "tuning":
+        benchmark_encode_tuning()
+    elif len(sys.argv) > 1 and sys.argv[1] == "workers":
+        benchmark_encode_workers()
+    elif len(sys.argv) > 1 and sys.argv[1] == "pipeline":
+        benchmark_offline_pipeline()
+    elif len(sys.argv) > 1 and sys.argv[1] == "predictor":
+        benchmark_duration_predictor()
+    else:
+        benchmark_encoders()
@@ -1,4 +1,7 @@
+from concurrent.futures import ThreadPoolExecutor
+
 from utils.db import init_db
+from utils.llm_gateway import get_llm_gateway
 from coordinator import CoordinatorAgent
 
 from agents.curriculum_agent import CurriculumAgent
@@ -96,6 +99,11 @@ def main():
             print("❌ No scripts generated!")
             return
 
+        scripted = {item["lesson"] for item in scripts}
+        missing = [lesson["title"] for lesson in curriculum if lesson["title"] not in scripted]
+        if missing:
+            print(f"⚠️ Skipping {len(missing)} lesson(s) whose script failed: {', '.join(missing)}")
+
         print("\n📝 Script Previews for All Lessons:")
         for idx, item in enumerate(scripts, 1):
             print(f"\n--- Script for Lesson {idx}: {item['lesson']} ---")
@@ -107,6 +115,19 @@ def main():
 
     print("=" * 150)
 
+    # Slides and overlay sprites only depend on the scripts, so they are rendered in the
+    # background while the voice is synthesized
+    slide_prep = ThreadPoolExecutor(max_workers=1)
+    prepared = [
+        slide_prep.submit(visual_agent.prepare, {
+            "character": character,
+            "lesson_title": script_item["lesson"],
+            "script": script_item["script"],
+            "overlay_data": script_item.get("overlay_data", {})
+        })
+        for script_item in scripts
+    ]
+
     # Generate voice for ALL lessons
     for idx, script_item in enumerate(scripts, 1):
         try:
@@ -134,8 +155,42 @@ def main():
             print(f"❌ Error generating voice for Lesson {idx}: {e}")
             continue
     
+    for idx, future in enumerate(prepared, 1):
+        try:
+            future.result()
+        except Exception as e:
+            print(f"⚠️ Slides for Lesson {idx} were not prepared, they will be rendered with the video: {e}")
+    slide_prep.shutdown()
+    
     print("=" * 150)
 
+    # Optional low-resolution preview before paying for the full render
+    preview = input("\nRender a quick draft preview (640x360, 8 fps) first? (y/N): ").strip().lower()
+    if preview == "y":
+        draft_agent = VisualAgent(profile="draft")
+        for idx, script_item in enumerate(scripts, 1):
+            if not script_item.get("voice_path"):
+                continue
+            try:
+                draft_input = {
+                    "character": character,
+                    "lesson_title": script_item["lesson"],
+                    "script": script_item["script"],
+                    "voice_path": script_item["voice_path"],
+                    "overlay_data": script_item.get("overlay_data", {})
+                }
+                if script_item.get("timing_data"):
+                    draft_input["timing"] = script_item["timing_data"]
+                draft_path = draft_agent.run(draft_input)
+                print(f"👀 Draft for Lesson {idx}: {draft_path}")
+            except Exception as e:
+                print(f"❌ Error rendering draft for Lesson {idx}: {e}")
+
+        proceed = input("\nContinue with the full production render? (Y/n): ").strip().lower()
+        if proceed == "n":
+            print("\n👋 Stopping after the draft preview.")
+            return
+
     # Generate video for ALL lessons
     for idx, script_item in enumerate(scripts, 1):
         try:
@@ -210,6 +265,7 @@ def main():
             continue
 
     print("\n🎉 Content generation complete with synchronized audio!")
+    get_llm_gateway().print_stats()
 
     print("=" * 150)
 
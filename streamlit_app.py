@@ -120,6 +120,11 @@ with st.sidebar:
         value=1
     )
     
+    draft_preview = st.checkbox(
+        "Quick draft preview (640×360, 8 fps)",
+        value=False
+    )
+    
     st.divider()
     
     generate_button = st.button(
@@ -140,7 +145,8 @@ if generate_button and topic:
             json={
                 "topic": topic,
                 "character_name": character_name,
-                "num_lessons": num_lessons
+                "num_lessons": num_lessons,
+                "profile": "draft" if draft_preview else "production"
             }
         )
         job_id = response.json()["job_id"]
@@ -124,8 +124,9 @@ David (encouraging): Today, we unlocked the basics of RAG. Dive deeper, experime
     print("1. Generate full video")
     print("2. Generate test video (first 30 seconds)")
     print("3. Test slide parsing only")
+    print("4. Generate draft preview (640x360, 8 fps)")
 
-    choice = input("Select option (1/2/3): ").strip()
+    choice = input("Select option (1/2/3/4): ").strip()
 
     if choice == "3":
         print("\n📝 Testing slide parsing...")
@@ -139,6 +140,10 @@ David (encouraging): Today, we unlocked the basics of RAG. Dive deeper, experime
 
     test_mode = (choice == "2")
 
+    if choice == "4":
+        print("\n📐 Using the draft render profile for a fast preview")
+        visual_agent = VisualAgent(profile="draft")
+
     # Prepare input data
     input_data = {
         "character": character,
@@ -0,0 +1,149 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+class DiskCache:
+    """
+    Content-keyed byte cache with a bounded memory tier and a size-bounded disk tier.
+    Both tiers evict least recently used entries; the disk tier survives across jobs.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int, memory_max_bytes: int = 0, suffix: str = ".bin"):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.memory_max_bytes = memory_max_bytes
+        self.suffix = suffix
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._index: "OrderedDict[str, int]" = self._load_index()
+        self._disk_bytes = sum(self._index.values())
+
+    @staticmethod
+    def make_key(*parts) -> str:
+        """Hash the exact inputs that determine an entry's content"""
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(repr(part).encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return cached bytes for key, or None on a miss"""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                if key in self._index:
+                    self._index.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return self._memory[key]
+
+            if key not in self._index:
+                self._stats["misses"] += 1
+                return None
+
+            path = self._path(key)
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+                os.utime(path)
+            except OSError:
+                # Another process evicted it
+                self._disk_bytes -= self._index.pop(key)
+                self._stats["misses"] += 1
+                return None
+
+            self._index.move_to_end(key)
+            self._remember(key, data)
+            self._stats["disk_hits"] += 1
+            return data
+
+    def put(self, key: str, data: bytes):
+        """Store bytes under key and evict old entries beyond the quotas"""
+        with self._lock:
+            if len(data) > self.max_bytes:
+                return
+
+            path = self._path(key)
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                with open(temp_path, "wb") as f:
+                    f.write(data)
+                os.replace(temp_path, path)
+            except OSError as e:
+                print(f"⚠️ Could not write cache entry {path}: {e}")
+                return
+
+            if key in self._index:
+                self._disk_bytes -= self._index.pop(key)
+            self._index[key] = len(data)
+            self._disk_bytes += len(data)
+            self._remember(key, data)
+            self._evict_disk()
+
+    def stats(self) -> Dict:
+        """Hit/miss counters, hit rate and current sizes"""
+        with self._lock:
+            hits = self._stats["memory_hits"] + self._stats["disk_hits"]
+            lookups = hits + self._stats["misses"]
+            return {
+                **self._stats,
+                "hits": hits,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "entries": len(self._index),
+                "disk_bytes": self._disk_bytes,
+                "memory_bytes": self._memory_bytes,
+            }
+
+    def clear_memory(self):
+        """Drop the memory tier; disk entries are kept"""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + self.suffix)
+
+    def _load_index(self) -> "OrderedDict[str, int]":
+        """Rebuild the LRU order from the files already on disk, oldest access first"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(self.suffix):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, name[:-len(self.suffix)], stat.st_size))
+
+        entries.sort()
+        return OrderedDict((key, size) for _, key, size in entries)
+
+    def _remember(self, key: str, data: bytes):
+        """Keep data in the memory tier, evicting least recently used entries"""
+        if len(data) > self.memory_max_bytes:
+            return
+        if key in self._memory:
+            self._memory_bytes -= len(self._memory.pop(key))
+        self._memory[key] = data
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self.memory_max_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def _evict_disk(self):
+        while self._disk_bytes > self.max_bytes and self._index:
+            key, size = self._index.popitem(last=False)
+            self._disk_bytes -= size
+            self._stats["evictions"] += 1
+            if key in self._memory:
+                self._memory_bytes -= len(self._memory.pop(key))
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
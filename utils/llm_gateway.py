@@ -0,0 +1,116 @@
+import openai
+import os
+import threading
+import time
+from dotenv import load_dotenv
+from typing import Dict, List, Optional
+from .rate_limiter import TokenBucket
+
+load_dotenv()
+
+# Limits shared by every agent in the process; set them to the deployment's quota
+LLM_MAX_IN_FLIGHT = int(os.getenv("AZURE_OPENAI_LLM_MAX_IN_FLIGHT", "4"))
+LLM_REQUESTS_PER_MINUTE = int(os.getenv("AZURE_OPENAI_LLM_RPM", "60"))  # 0 disables the request bucket
+LLM_TOKENS_PER_MINUTE = int(os.getenv("AZURE_OPENAI_LLM_TPM", "80000"))  # 0 disables the token bucket
+LLM_DEFAULT_COMPLETION_TOKENS = 4000  # Completion budget assumed for calls without max_completion_tokens
+LLM_CHARS_PER_TOKEN = 4  # Rough prompt size estimate before the server counts it
+LLM_MAX_RETRIES = 2  # Retries the client makes itself on 429s and connection errors
+
+_llm_gateway: Optional["LLMGateway"] = None
+_gateway_lock = threading.Lock()
+
+def get_llm_gateway() -> "LLMGateway":
+    """Process-wide LLM gateway shared by the curriculum, character and script agents"""
+    global _llm_gateway
+    with _gateway_lock:
+        if _llm_gateway is None:
+            _llm_gateway = LLMGateway()
+        return _llm_gateway
+
+class LLMGateway:
+    """
+    One Azure OpenAI client, and so one pooled set of connections, for every agent. Calls are
+    limited to max_in_flight at a time and paced by request and token buckets; each call is
+    charged its prompt estimate plus its completion budget up front, the way the service counts
+    it against the deployment's limit. Latency and token usage are accounted per agent.
+    """
+
+    def __init__(self, max_in_flight: int = LLM_MAX_IN_FLIGHT,
+                 requests_per_minute: int = LLM_REQUESTS_PER_MINUTE,
+                 tokens_per_minute: int = LLM_TOKENS_PER_MINUTE, client=None):
+        self.client = client or openai.AzureOpenAI(
+            api_key=os.getenv("AZURE_OPENAI_LLM_KEY"),
+            api_version=os.getenv("AZURE_OPENAI_LLM_API_VERSION"),
+            azure_endpoint=os.getenv("AZURE_OPENAI_LLM_ENDPOINT"),
+            max_retries=LLM_MAX_RETRIES,
+        )
+        self.deployment = os.getenv("AZURE_OPENAI_LLM_DEPLOYMENT_NAME")
+        self.max_in_flight = max(1, max_in_flight)
+        self._slots = threading.BoundedSemaphore(self.max_in_flight)
+        self._requests = TokenBucket(requests_per_minute)
+        self._tokens = TokenBucket(tokens_per_minute)
+        self._stats: Dict[str, Dict] = {}
+        self._stats_lock = threading.Lock()
+
+    def chat(self, agent: str, messages: List[Dict], **options):
+        """chat.completions.create on the shared deployment, within the limits, accounted to agent"""
+        estimate = self.estimate_tokens(messages, options.get("max_completion_tokens"))
+
+        with self._slots:
+            waited = self._requests.acquire(1) + self._tokens.acquire(estimate)
+            if waited >= 1:
+                print(f"⏳ LLM rate limit: {agent} waited {waited:.1f}s")
+
+            start = time.perf_counter()
+            try:
+                response = self.client.chat.completions.create(
+                    model=self.deployment, messages=messages, **options
+                )
+            except openai.RateLimitError:
+                # The client has already retried; hold everyone back until the window refills
+                self._requests.drain()
+                self._tokens.drain()
+                self._record(agent, time.perf_counter() - start, waited, error="rate_limited")
+                raise
+            except Exception:
+                self._record(agent, time.perf_counter() - start, waited, error="errors")
+                raise
+
+        self._record(agent, time.perf_counter() - start, waited, usage=getattr(response, "usage", None))
+        return response
+
+    @staticmethod
+    def estimate_tokens(messages: List[Dict], max_completion_tokens: Optional[int] = None) -> int:
+        prompt_chars = sum(len(str(message.get("content", ""))) for message in messages)
+        return prompt_chars // LLM_CHARS_PER_TOKEN + (max_completion_tokens or LLM_DEFAULT_COMPLETION_TOKENS)
+
+    def _record(self, agent: str, latency: float, waited: float, usage=None, error: Optional[str] = None):
+        with self._stats_lock:
+            stats = self._stats.setdefault(agent, {
+                "requests": 0, "errors": 0, "rate_limited": 0, "prompt_tokens": 0, "completion_tokens": 0,
+                "latency_total": 0.0, "latency_max": 0.0, "wait_total": 0.0,
+            })
+            stats["requests"] += 1
+            stats["latency_total"] += latency
+            stats["latency_max"] = max(stats["latency_max"], latency)
+            stats["wait_total"] += waited
+            if error:
+                stats[error] += 1
+            if usage is not None:
+                stats["prompt_tokens"] += getattr(usage, "prompt_tokens", 0) or 0
+                stats["completion_tokens"] += getattr(usage, "completion_tokens", 0) or 0
+
+    def stats(self) -> Dict[str, Dict]:
+        """Per-agent request counts, token usage and latency since start-up"""
+        with self._stats_lock:
+            return {
+                agent: {**stats, "latency_avg": stats["latency_total"] / stats["requests"]}
+                for agent, stats in self._stats.items()
+            }
+
+    def print_stats(self):
+        for agent, stats in self.stats().items():
+            print(f"📈 LLM {agent}: {stats['requests']} request(s), "
+                  f"{stats['prompt_tokens']} prompt + {stats['completion_tokens']} completion tokens, "
+                  f"avg {stats['latency_avg']:.1f}s (max {stats['latency_max']:.1f}s), "
+                  f"waited {stats['wait_total']:.1f}s, {stats['errors'] + stats['rate_limited']} failed")
@@ -0,0 +1,39 @@
+import threading
+import time
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at rate_per_minute, holding at most
+    one minute of budget. Callers reserve their amount up front and sleep off any deficit
+    outside the lock, so waiters are served in arrival order without polling.
+    """
+
+    def __init__(self, rate_per_minute: float):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(rate_per_minute)
+        self._available = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1) -> float:
+        """Take amount from the bucket, waiting until it is covered; returns the seconds waited"""
+        if self.rate <= 0:
+            return 0.0
+        # A single request larger than the bucket can never be covered, so it takes the whole bucket
+        amount = min(amount, self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self._available = min(self.capacity, self._available + (now - self._updated) * self.rate)
+            self._updated = now
+            self._available -= amount
+            wait = -self._available / self.rate if self._available < 0 else 0.0
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def drain(self):
+        """Empty the bucket, e.g. after the server reports that the limit was hit"""
+        with self._lock:
+            self._available = min(self._available, 0.0)
+            self._updated = time.monotonic()